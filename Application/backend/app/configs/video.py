@@ -0,0 +1,65 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Slides are still images, so frame rate and preset can be far lower than
+# for camera footage without any visible loss.
+ENCODING_PROFILES = {
+    "fast-preview": {
+        "preset": "ultrafast",
+        "crf": 30,
+        "fps": 1,
+        "width": 1280,
+        "height": 720,
+        "audio_bitrate": "96k",
+    },
+    "standard": {
+        "preset": "veryfast",
+        "crf": 23,
+        "fps": 2,
+        "width": 1920,
+        "height": 1080,
+        "audio_bitrate": "128k",
+    },
+    "archive": {
+        "preset": "slow",
+        "crf": 18,
+        "fps": 5,
+        "width": 1920,
+        "height": 1080,
+        "audio_bitrate": "192k",
+    },
+}
+
+DEFAULT_ENCODING_PROFILE = os.getenv("VIDEO_ENCODING_PROFILE", "standard")
+
+# Move the moov atom to the front of final course videos so players can
+# start before the whole file has been downloaded.
+VIDEO_FASTSTART = os.getenv("VIDEO_FASTSTART", "true").lower() == "true"
+
+
+def validate_encoding_profile(name: str | None) -> str | None:
+    """Return name unchanged, or raise ValueError if it is not a known profile."""
+    if name is not None and name not in ENCODING_PROFILES:
+        raise ValueError(f"Encoding profile must be one of: {', '.join(ENCODING_PROFILES)}")
+    return name
+
+def get_encoding_profile(name: str | None = None) -> dict:
+    name = validate_encoding_profile(name or DEFAULT_ENCODING_PROFILE)
+    return {"name": name, **ENCODING_PROFILES[name]}
+
+# Optional HLS packaging of the final course video. Renditions taller than
+# the encoding profile's resolution are skipped.
+VIDEO_HLS_ENABLED = os.getenv("VIDEO_HLS_ENABLED", "false").lower() == "true"
+HLS_SEGMENT_SECONDS = int(os.getenv("HLS_SEGMENT_SECONDS", "6"))
+# Cache lifetime of the master playlist, which names the current version.
+HLS_MASTER_MAX_AGE = int(os.getenv("HLS_MASTER_MAX_AGE", "60"))
+# Superseded versions stay on disk this long after they are replaced, so
+# players that loaded an older master playlist can finish their stream.
+HLS_RETENTION_SECONDS = max(int(os.getenv("HLS_RETENTION_SECONDS", str(6 * 3600))), 2 * HLS_MASTER_MAX_AGE)
+HLS_LADDER = [
+    {"name": "1080p", "height": 1080, "video_bitrate": "2500k", "audio_bitrate": "128k"},
+    {"name": "720p", "height": 720, "video_bitrate": "1200k", "audio_bitrate": "96k"},
+    {"name": "480p", "height": 480, "video_bitrate": "600k", "audio_bitrate": "64k"},
+]
@@ -8,7 +8,12 @@ from app.models.course import Course
 from app.models.lesson import Lesson
 from app.models.group import Group
 from app.models.session import Session
+from app.models.video_job import VideoJob
 from app.routers import presentations
+from app.services.browser_pool import browser_pool
+from app.services.http_client import close_client
+from app.services.model_pool import model_pool
+from app.services.transcription_pool import transcription_pool, WHISPER_PRELOAD
 
 app = FastAPI(title="AI-Powered E-Learning Platform Backend")
 
@@ -36,6 +41,32 @@ app.include_router(sessions.router)
 app.include_router(groups.router)
 
 
+@app.on_event("shutdown")
+def shutdown_browser_pool():
+    browser_pool.close()
+
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await close_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_model_pool():
+    await model_pool.close()
+
+
+@app.on_event("startup")
+async def start_transcription_pool():
+    if WHISPER_PRELOAD:
+        await transcription_pool.warm()
+
+
+@app.on_event("shutdown")
+def shutdown_transcription_pool():
+    transcription_pool.close()
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the AI-Powered E-Learning Platform Backend"}
\ No newline at end of file
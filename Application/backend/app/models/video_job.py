@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, Enum, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from app.configs.db import Base
+from enum import Enum as PyEnum
+from datetime import datetime
+import uuid
+
+class VideoJobStatus(PyEnum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+class VideoJob(Base):
+    __tablename__ = "video_jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    ai_request_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    language = Column(String, nullable=False)
+    # Null when the job asks the model itself, from course_request.
+    response = Column(JSON, nullable=True)
+    course_request = Column(JSON, nullable=True)
+    model_api_host = Column(String, nullable=True)
+    # video_job_service.job_hash of course_request (and response, when
+    # given); identical in-flight submissions join the job as aliases.
+    request_hash = Column(String, nullable=True, index=True)
+    batch_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    # Duplicate ai_request_ids served from this job's output.
+    aliases = Column(JSON, nullable=False, default=list)
+    spring_boot_host = Column(String, nullable=False, default="localhost")
+    encoding_profile = Column(String, nullable=True)
+    status = Column(Enum(VideoJobStatus), nullable=False, default=VideoJobStatus.QUEUED, index=True)
+    stage = Column(String, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,78 +1,200 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from app.schemas.courseRequest import CourseRequest
-from app.services.content_service import send_content, check_and_generate_video, transfer_video
+from app.services.content_service import request_course_content, produce_course_video, transfer_video
+from app.services.video_job_service import submit_job, get_job, submit_batch, get_batch
+from app.services.slide_templates import STYLESHEET_NAME, STYLESHEET_HREF
+from app.services.file_serving import serve_file, serve_bytes
+from app.services.presentation_cache import presentation_cache
+from app.services.http_client import transfer_metrics
+from app.services.presentation_manifest import build_manifest_async, iter_bundle
+from app.schemas.video_job import VideoJobResponse, BatchRequest, BatchResponse
+from app.configs.db import get_db
+from app.configs.video import validate_encoding_profile, HLS_MASTER_MAX_AGE
+from sqlalchemy.orm import Session
 import os
 import json
-import httpx
+import time
+import hashlib
 import logging
 from uuid import UUID
+from typing import Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["slides"])
 
+HLS_MEDIA_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t"}
+
+def resolve_encoding_profile(payload: CourseRequest, encoding_profile: Optional[str]) -> Optional[str]:
+    try:
+        return validate_encoding_profile(encoding_profile or payload.encoding_profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/api/presentations/cache/stats")
+async def get_presentation_cache_stats():
+    return presentation_cache.stats()
+
+@router.get("/api/presentations/transfers/stats")
+async def get_transfer_stats():
+    return transfer_metrics.stats()
+
 @router.get("/api/presentations/{session_id}/slides")
-async def get_slides_data(session_id: str):
+async def get_slides_data(request: Request, session_id: str):
     try:
         slides_file_path = f"presentations/{session_id}/slides.json"
-        if not os.path.exists(slides_file_path):
-            raise HTTPException(status_code=404, detail="Slides data not found")
-        with open(slides_file_path, 'r', encoding='utf-8') as file:
-            slides_data = json.load(file)
-        return {"slides": slides_data}
+        # The response body is encoded once per file version and served from memory.
+        cached = presentation_cache.get(
+            slides_file_path,
+            lambda data: json.dumps({"slides": json.loads(data)}, ensure_ascii=False).encode('utf-8'),
+            variant="response"
+        )
+        return serve_bytes(request, cached.value, "application/json", cached.etag, cached.mtime)
     except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Slides data file not found")
+        raise HTTPException(status_code=404, detail="Slides data not found")
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Invalid JSON format")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/presentations/{session_id}/slide/{slide_number}", response_class=HTMLResponse)
-async def get_slide_html(session_id: str, slide_number: int):
+async def get_slide_html(request: Request, session_id: str, slide_number: int):
     try:
         html_file_path = f"presentations/{session_id}/slides/slide{slide_number}.html"
-        if not os.path.exists(html_file_path):
-            raise HTTPException(status_code=404, detail="Slide not found")
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        return HTMLResponse(content=html_content)
+        # Slides are shown through iframe srcdoc, where a relative stylesheet
+        # link cannot resolve, so point it at the stylesheet endpoint.
+        stylesheet_url = str(request.url_for("get_presentation_stylesheet", session_id=session_id))
+        cached = presentation_cache.get(
+            html_file_path,
+            lambda data: data.replace(
+                f'href="{STYLESHEET_HREF}"'.encode('utf-8'), f'href="{stylesheet_url}"'.encode('utf-8'), 1
+            ),
+            variant=stylesheet_url
+        )
+        return serve_bytes(request, cached.value, "text/html; charset=utf-8", cached.etag, cached.mtime)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Slide not found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/api/presentations/{session_id}/audio/{slide_number}")
-async def get_audio(session_id: str, slide_number: int):
-    def generate():
-        with open(f"presentations/{session_id}/audios/audio{slide_number}.mp3", "rb") as audio_file:
-            yield from audio_file
+@router.get("/api/presentations/{session_id}/manifest")
+async def get_presentation_manifest(request: Request, session_id: str):
+    presentation_dir = f"presentations/{session_id}"
+    try:
+        manifest = await build_manifest_async(
+            presentation_dir, lambda name, **params: str(request.url_for(name, **params))
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Presentation not found")
+    body = json.dumps(manifest, ensure_ascii=False).encode('utf-8')
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return serve_bytes(request, body, "application/json", etag, time.time(), "no-cache")
+
+@router.get("/api/presentations/{session_id}/bundle.zip")
+async def get_presentation_bundle(session_id: str, include_video: bool = False):
+    presentation_dir = f"presentations/{session_id}"
+    if not os.path.isdir(f"{presentation_dir}/slides"):
+        raise HTTPException(status_code=404, detail="Presentation not found")
     return StreamingResponse(
-        generate(),
-        media_type="audio/mpeg",
-        headers={
-            "Accept-Ranges": "bytes",
-            "Cache-Control": "public, max-age=3600"
-        }
+        iter_bundle(presentation_dir, include_video),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="presentation-{session_id}.zip"'}
     )
 
+@router.get("/api/presentations/{session_id}/styles.css")
+async def get_presentation_stylesheet(request: Request, session_id: str):
+    stylesheet_path = f"presentations/{session_id}/{STYLESHEET_NAME}"
+    if not os.path.exists(stylesheet_path):
+        raise HTTPException(status_code=404, detail="Stylesheet not found")
+    return serve_file(request, stylesheet_path, "text/css; charset=utf-8")
+
+@router.get("/api/presentations/{session_id}/audio/{slide_number}")
+async def get_audio(request: Request, session_id: str, slide_number: int):
+    audio_path = f"presentations/{session_id}/audios/audio{slide_number}.mp3"
+    if not os.path.exists(audio_path):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return serve_file(request, audio_path, "audio/mpeg")
+
+@router.get("/api/presentations/{ai_request_id}/video")
+async def get_course_video(request: Request, ai_request_id: UUID):
+    video_path = f"presentations/{ai_request_id}/{ai_request_id}.mp4"
+    if not os.path.exists(video_path):
+        raise HTTPException(status_code=404, detail="Video not found")
+    return serve_file(request, video_path, "video/mp4")
+
+@router.get("/api/presentations/{ai_request_id}/hls/master.m3u8")
+async def get_hls_master(ai_request_id: UUID):
+    hls_dir = f"presentations/{ai_request_id}/hls"
+    try:
+        with open(f"{hls_dir}/current", 'r') as f:
+            version = f.read().strip()
+        with open(f"{hls_dir}/{version}/master.m3u8", 'r') as f:
+            playlist = f.read()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="HLS stream not found")
+    # Point variant playlists at the versioned, immutable asset URLs.
+    lines = [
+        f"{version}/{line}" if line and not line.startswith('#') else line
+        for line in playlist.splitlines()
+    ]
+    return Response(
+        content="\n".join(lines) + "\n",
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": f"public, max-age={HLS_MASTER_MAX_AGE}"}
+    )
+
+@router.get("/api/presentations/{ai_request_id}/hls/{version}/{asset_path:path}")
+async def get_hls_asset(request: Request, ai_request_id: UUID, version: str, asset_path: str):
+    hls_root = os.path.realpath(f"presentations/{ai_request_id}/hls/{version}")
+    asset = os.path.realpath(os.path.join(hls_root, asset_path))
+    if not asset.startswith(hls_root + os.sep) or not os.path.isfile(asset):
+        raise HTTPException(status_code=404, detail="HLS asset not found")
+    media_type = HLS_MEDIA_TYPES.get(os.path.splitext(asset)[1])
+    if media_type is None:
+        raise HTTPException(status_code=404, detail="HLS asset not found")
+    # Versioned paths never change content once written.
+    return serve_file(request, asset, media_type, "public, max-age=31536000, immutable")
+
 @router.post("/api/presentations/{ai_request_id}/generate/start")
 async def send_to_model(ai_request_id: UUID, payload: CourseRequest, model_api_host: str = "localhost"):
     try:
         logger.info(f"Initiating video generation for ai_request_id: {ai_request_id}")
-        response = await send_content(payload, ai_request_id, model_api_host)
+        response = await request_course_content(payload, ai_request_id, model_api_host)
         return {"message": "Video generation initiated successfully", "ai_request_id": str(ai_request_id), "response": response}
     except Exception as e:
         logger.error(f"Error initiating video generation for ai_request_id {ai_request_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error initiating video generation: {str(e)}")
 
 @router.post("/api/presentations/{ai_request_id}/generate/process")
-async def process_content(ai_request_id: UUID, payload: CourseRequest, response: dict, spring_boot_host: str = "localhost"):
+async def process_content(ai_request_id: UUID, payload: CourseRequest, response: dict, spring_boot_host: str = "localhost", encoding_profile: Optional[str] = None):
+    profile = resolve_encoding_profile(payload, encoding_profile)
     try:
-        result = await check_and_generate_video(ai_request_id, payload.language, response, spring_boot_host)
+        result = await produce_course_video(ai_request_id, payload, response, spring_boot_host, encoding_profile=profile)
         return {"message": "Video processed and sent to Spring Boot successfully", "result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/api/presentations/{ai_request_id}/generate/jobs", response_model=VideoJobResponse, status_code=202)
+def submit_video_job(ai_request_id: UUID, payload: CourseRequest, response: dict, spring_boot_host: str = "localhost", encoding_profile: Optional[str] = None, db: Session = Depends(get_db)):
+    profile = resolve_encoding_profile(payload, encoding_profile)
+    return submit_job(db, ai_request_id, payload.language, response, spring_boot_host, profile, payload)
+
+@router.get("/api/presentations/jobs/{job_id}", response_model=VideoJobResponse)
+def get_video_job(job_id: UUID, db: Session = Depends(get_db)):
+    return get_job(db, job_id)
+
+@router.post("/api/presentations/generate/batch", response_model=BatchResponse, status_code=202)
+def submit_batch_generation(batch: BatchRequest, spring_boot_host: str = "localhost", model_api_host: str = "localhost", db: Session = Depends(get_db)):
+    return submit_batch(db, batch, spring_boot_host, model_api_host)
+
+@router.get("/api/presentations/batches/{batch_id}", response_model=BatchResponse)
+def get_batch_generation(batch_id: UUID, db: Session = Depends(get_db)):
+    return get_batch(db, batch_id)
+
 @router.post("/api/presentations/{ai_request_id}/test-transfer")
 async def test_video_transfer(ai_request_id: UUID, spring_boot_host: str = "localhost"):
     return await transfer_video(ai_request_id, spring_boot_host)
\ No newline at end of file
@@ -32,10 +32,13 @@ async def websocket_endpoint(websocket: WebSocket):
             if message.get("type") == "text_question":
                 question_text = message.get("question", "")
                 course_id = message.get("course_id", None)
-                await qa_service.process_question(websocket, question_text, course_id)
+                stream = bool(message.get("stream", False))
+                await qa_service.process_question(websocket, question_text, course_id, stream)
             elif message.get("type") == "voice_question":
                 audio_data_b64 = message.get("audio_data", "")
-                await qa_service.handle_voice_question(websocket, audio_data_b64)
+                course_id = message.get("course_id", None)
+                stream = bool(message.get("stream", False))
+                await qa_service.handle_voice_question(websocket, audio_data_b64, course_id, stream)
             else:
                 await qa_service.manager.send_response(websocket, {
                     "type": "error",
@@ -60,4 +63,8 @@ async def websocket_endpoint(websocket: WebSocket):
 @router.post("/transcribe")
 async def transcribe_audio(audio: UploadFile, course_id: str = Form(None)):
     result = await qa_service.transcribe_audio(audio, course_id)
-    return result
\ No newline at end of file
+    return result
+
+@router.get("/cache/stats")
+async def answer_cache_stats():
+    return qa_service.answer_cache.stats()
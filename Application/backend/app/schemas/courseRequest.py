@@ -1,8 +1,10 @@
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from uuid import UUID
 
+from app.configs.video import validate_encoding_profile
+from app.services.slide_templates import validate_theme
 
 
 class CourseRequest(BaseModel):
@@ -10,10 +12,25 @@ class CourseRequest(BaseModel):
     topic: str
     level: str
     axes: List[str]
+    encoding_profile: Optional[str] = None
+    # Slide theme of the rendered course; SLIDE_THEME when unset.
+    theme: Optional[str] = None
+    # Ask the model again instead of reusing the output of an identical request.
+    regenerate: bool = False
+
+    @field_validator('encoding_profile')
+    @classmethod
+    def validate_encoding_profile(cls, v):
+        return validate_encoding_profile(v)
+
+    @field_validator('theme')
+    @classmethod
+    def validate_theme(cls, v):
+        return validate_theme(v)
 
 class AIRequest(BaseModel):
     language: str
     topic: str
     level: str
     axes: List[str]
-    moduleId: UUID
\ No newline at end of file
+    moduleId: UUID
@@ -0,0 +1,75 @@
+from pydantic import BaseModel, ConfigDict, field_validator
+from datetime import datetime
+from typing import Optional, Any, List, Dict
+from enum import Enum
+from uuid import UUID
+
+from app.schemas.courseRequest import CourseRequest
+from app.configs.video import validate_encoding_profile
+
+class VideoJobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+class VideoJobResponse(BaseModel):
+    id: UUID
+    ai_request_id: UUID
+    batch_id: Optional[UUID] = None
+    aliases: List[UUID] = []
+    status: VideoJobStatus
+    encoding_profile: Optional[str] = None
+    stage: Optional[str] = None
+    progress: float
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm(cls, obj):
+        data = obj.__dict__.copy()
+        if 'status' in data and isinstance(data['status'], Enum):
+            data['status'] = data['status'].value
+        data['aliases'] = data.get('aliases') or []
+        return cls(**data)
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BatchItem(BaseModel):
+    ai_request_id: UUID
+    request: CourseRequest
+    # Model output, when already available; otherwise the job requests it.
+    response: Optional[dict] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    encoding_profile: Optional[str] = None
+
+    @field_validator('items')
+    @classmethod
+    def validate_items(cls, v):
+        if not v:
+            raise ValueError("A batch needs at least one item")
+        ids = [item.ai_request_id for item in v]
+        if len(ids) != len(set(ids)):
+            raise ValueError("ai_request_id values must be unique within a batch")
+        return v
+
+    @field_validator('encoding_profile')
+    @classmethod
+    def validate_encoding_profile(cls, v):
+        return validate_encoding_profile(v)
+
+class BatchResponse(BaseModel):
+    batch_id: UUID
+    status: VideoJobStatus
+    progress: float
+    total: int
+    counts: Dict[str, int]
+    # Every requested ai_request_id -> the job producing its video.
+    assignments: Dict[UUID, UUID]
+    jobs: List[VideoJobResponse]
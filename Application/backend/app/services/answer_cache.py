@@ -0,0 +1,191 @@
+"""Cache of model answers to learner questions, per course.
+
+By default a question only hits the cache when its normalized text (case,
+Unicode form, punctuation and spacing ignored) matches a cached question
+of the same course. Entries expire after ANSWER_CACHE_TTL seconds and the
+least recently used are evicted beyond ANSWER_CACHE_SIZE.
+
+Setting ANSWER_CACHE_SIMILARITY below 1.0 also reuses the answer of the
+closest cached question when their cosine similarity reaches it. Questions
+are then embedded as a hashed bag of word n-grams and character trigrams,
+computed locally with no model to load. That measure is lexical, not
+semantic: "convert String to int" and "convert int to String", or "explain
+slide 3" and "explain slide 4", score around 0.9. Keep it at 1.0 unless
+wrong answers to near-identical wordings are acceptable.
+"""
+import os
+import re
+import zlib
+import logging
+import threading
+import unicodedata
+
+import numpy as np
+from cachetools import TTLCache
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "4096"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(6 * 3600)))
+# 1.0 restricts the cache to exact (normalized) matches; see above.
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "1.0"))
+EMBEDDING_DIM = 1024
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_question(question: str) -> str:
+    text = unicodedata.normalize("NFKC", question).lower()
+    return " ".join(_WORD_RE.findall(text))
+
+
+def embed(normalized: str) -> np.ndarray:
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    words = normalized.split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {normalized} "
+    features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    for feature in features:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        # One bit of the hash picks the sign, which keeps collisions unbiased.
+        vector[digest % EMBEDDING_DIM] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _CourseIndex:
+    """Embeddings of one course's cached questions, as rows of one matrix.
+
+    Rows are added and removed in place (removal moves the last row into
+    the gap), so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self):
+        self.questions: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.matrix = np.empty((8, EMBEDDING_DIM), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def add(self, question: str, vector: np.ndarray):
+        row = self.rows.get(question)
+        if row is None:
+            row = len(self.questions)
+            if row == len(self.matrix):
+                self.matrix = np.resize(self.matrix, (2 * row, EMBEDDING_DIM))
+            self.rows[question] = row
+            self.questions.append(question)
+        self.matrix[row] = vector
+
+    def remove(self, question: str):
+        row = self.rows.pop(question)
+        last = self.questions.pop()
+        if last != question:
+            self.matrix[row] = self.matrix[len(self.questions)]
+            self.questions[row] = last
+            self.rows[last] = row
+
+    def nearest(self, vector: np.ndarray):
+        scores = self.matrix[:len(self.questions)] @ vector
+        best = int(np.argmax(scores))
+        return self.questions[best], float(scores[best])
+
+
+class AnswerCache:
+    def __init__(self, maxsize: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL,
+                 threshold: float = ANSWER_CACHE_SIMILARITY):
+        self.threshold = threshold
+        # (course_id, normalized question) -> answer; owns TTL and LRU.
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        # course_id -> embeddings of its questions, the search space. Kept
+        # apart so searching it does not touch the LRU order, and only
+        # maintained when similarity matching is enabled.
+        self._courses: dict[str, _CourseIndex] = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _prune(self, course: str):
+        index = self._courses.get(course)
+        if index is None:
+            return
+        for question in [q for q in index.questions if (course, q) not in self._entries]:
+            index.remove(question)
+        if not index:
+            del self._courses[course]
+
+    def _nearest(self, course: str, vector: np.ndarray):
+        index = self._courses.get(course)
+        while index:
+            question, score = index.nearest(vector)
+            if (course, question) in self._entries:
+                return question, score
+            # Expired or evicted since it was indexed.
+            index.remove(question)
+        self._courses.pop(course, None)
+        return None
+
+    def get(self, course_id, question: str) -> str | None:
+        course = str(course_id or "")
+        normalized = normalize_question(question)
+        vector = embed(normalized) if self.threshold < 1.0 else None
+        with self._lock:
+            entry = self._entries.get((course, normalized))
+            if entry is not None:
+                self.exact_hits += 1
+                return entry
+            if vector is not None:
+                nearest = self._nearest(course, vector)
+                if nearest and nearest[1] >= self.threshold:
+                    self.similar_hits += 1
+                    logger.info(f"Answer cache: '{normalized}' matched '{nearest[0]}' ({nearest[1]:.3f})")
+                    # Reading through the cache refreshes the entry's LRU position.
+                    return self._entries[(course, nearest[0])]
+            self.misses += 1
+            return None
+
+    def put(self, course_id, question: str, answer: str):
+        if not answer:
+            return
+        course = str(course_id or "")
+        normalized = normalize_question(question)
+        if not normalized:
+            return
+        vector = embed(normalized) if self.threshold < 1.0 else None
+        with self._lock:
+            self._entries[(course, normalized)] = answer
+            if vector is None:
+                return
+            self._courses.setdefault(course, _CourseIndex()).add(normalized, vector)
+            # Evicted and expired questions are dropped lazily, when a lookup
+            # reaches them, or everywhere once they outnumber the live entries.
+            if sum(map(len, self._courses.values())) > 2 * self._entries.maxsize:
+                for other in list(self._courses):
+                    self._prune(other)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._courses.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._entries.expire()
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "courses": len(self._courses),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "threshold": self.threshold,
+            }
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,139 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+import unicodedata
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "cache/tts")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def place_file(source: str, destination: str):
+    """Hard-link source to destination, falling back to a copy across filesystems."""
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    tmp_path = f"{destination}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+class AudioCache:
+    """On-disk, content-addressed cache of synthesized speech.
+
+    Entries are keyed by sha256(voice + normalized script) and evicted
+    least-recently-used first once the cache exceeds max_bytes. The total
+    size is tracked incrementally, so the directory is only walked on the
+    first store and when eviction is due.
+
+    Entries are hard-linked into presentations, so their own mtime must not
+    change: it is what file_serving's ETags and the manifest's media info
+    are derived from. Use is recorded on an empty ``<key>.used`` sidecar.
+    """
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # running total of the directory, scanned on first store
+
+    def key(self, voice: str, text: str) -> str:
+        return hashlib.sha256(f"{voice}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.mp3")
+
+    def _touch(self, path: str):
+        """Mark the entry at path as recently used."""
+        marker = f"{os.path.splitext(path)[0]}.used"
+        try:
+            with open(marker, 'a'):
+                pass
+            os.utime(marker)
+        except OSError as e:
+            logger.warning(f"Could not mark TTS cache entry {path} as used: {e}")
+
+    def fetch(self, voice: str, text: str, destination: str) -> bool:
+        """Place a cached rendering at destination; return False on a miss."""
+        path = self._path(self.key(voice, text))
+        try:
+            place_file(path, destination)
+        except FileNotFoundError:
+            return False
+        self._touch(path)
+        return True
+
+    def store(self, voice: str, text: str, source: str):
+        path = self._path(self.key(voice, text))
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        try:
+            place_file(source, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"Could not cache TTS audio {source}: {e}")
+            return
+        self._touch(path)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += size - previous
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _scan(self):
+        entries = []
+        used = {}
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith(".used"):
+                    used[path[:-len(".used")]] = stat.st_mtime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        # Last use, or when the entry was stored if it has no marker.
+        entries = [(used.get(os.path.splitext(path)[0], mtime), size, path) for mtime, size, path in entries]
+        return entries, total
+
+    def evict(self):
+        # Only runs once the running total crosses max_bytes. The scan also
+        # resyncs the total with files written by other processes.
+        with self._lock:
+            entries, total = self._scan()
+            if total > self.max_bytes:
+                for _, size, path in sorted(entries):
+                    for stale in (path, f"{os.path.splitext(path)[0]}.used"):
+                        try:
+                            os.remove(stale)
+                        except FileNotFoundError:
+                            pass
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+                logger.info(f"TTS cache evicted down to {total} bytes")
+            self._size = total
+
+
+audio_cache = AudioCache()
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = int(os.getenv("SLIDE_BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("SLIDE_BROWSER_MAX_PAGES", "50"))
+BROWSER_READY_TIMEOUT = float(os.getenv("SLIDE_BROWSER_READY_TIMEOUT", "15"))
+WINDOW_WIDTH = 1920
+WINDOW_HEIGHT = 1080
+
+# Resolves once the document, its fonts and its images are loaded, then
+# fast-forwards CSS animations so the screenshot shows the final layout.
+_READY_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const images = Array.from(document.images).map(img => img.complete
+    ? Promise.resolve()
+    : new Promise(resolve => { img.onload = img.onerror = resolve; }));
+Promise.all([document.fonts ? document.fonts.ready : Promise.resolve(), ...images])
+    .then(() => {
+        if (document.getAnimations) {
+            document.getAnimations().forEach(animation => animation.finish());
+        }
+        requestAnimationFrame(() => requestAnimationFrame(() => done(true)));
+    })
+    .catch(() => done(false));
+"""
+
+
+class PooledBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """Pool of long-lived headless Chrome instances used to rasterize slides."""
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _options(self):
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument(f'--window-size={WINDOW_WIDTH},{WINDOW_HEIGHT}')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-software-rasterizer')
+        options.add_argument('--disable-background-timer-throttling')
+        options.add_argument('--disable-renderer-backgrounding')
+        options.add_argument('--disable-backgrounding-occluded-windows')
+        return options
+
+    def _launch(self) -> PooledBrowser:
+        driver = webdriver.Chrome(options=self._options())
+        driver.set_window_size(WINDOW_WIDTH, WINDOW_HEIGHT)
+        driver.set_script_timeout(BROWSER_READY_TIMEOUT)
+        driver.set_page_load_timeout(BROWSER_READY_TIMEOUT)
+        logger.info("Launched pooled headless browser")
+        return PooledBrowser(driver)
+
+    def _quit(self, browser: PooledBrowser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+        with self._lock:
+            self._created -= 1
+
+    def _is_healthy(self, browser: PooledBrowser) -> bool:
+        try:
+            return browser.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _take(self) -> PooledBrowser:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_launch = self._created < self.size
+                if can_launch:
+                    self._created += 1
+            if can_launch:
+                try:
+                    return self._launch()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # Pool is saturated: wait for a browser to come back, re-checking
+            # periodically in case a recycled one freed a launch slot.
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    @contextmanager
+    def browser(self):
+        """Borrow a healthy browser; it is returned (or recycled) on exit."""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        browser = self._take()
+        while not self._is_healthy(browser):
+            logger.warning("Discarding unhealthy pooled browser")
+            self._quit(browser)
+            browser = self._take()
+
+        failed = False
+        try:
+            yield browser.driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            browser.pages += 1
+            if failed or self._closed or browser.pages >= self.max_pages:
+                self._quit(browser)
+            else:
+                self._idle.put(browser)
+
+    def capture(self, html_path: str, output_png: str):
+        with self.browser() as driver:
+            driver.get(f"file://{os.path.abspath(html_path)}")
+            WebDriverWait(driver, BROWSER_READY_TIMEOUT).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            driver.execute_async_script(_READY_SCRIPT)
+            driver.save_screenshot(output_png)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(browser)
+
+
+browser_pool = BrowserPool()
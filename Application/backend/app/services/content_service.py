@@ -2,35 +2,103 @@ from fastapi import HTTPException
 import json
 from pathlib import Path
 import subprocess
+import shutil
 import edge_tts
 import os
-import httpx
-from selenium import webdriver
 from PIL import Image
-import time
 from app.schemas.courseRequest import CourseRequest
+from app.services.browser_pool import browser_pool
+from app.services.slide_rasterizer import render_slide_png
+from app.services.slide_templates import render_slide, write_stylesheet, STYLESHEET_NAME
+from app.services.audio_cache import audio_cache, place_file
+from app.services.http_client import request_with_retry, upload_file
+from app.services.generation_cache import request_key, render_key, generation_cache, single_flight
+from app.configs.video import (
+    get_encoding_profile, VIDEO_FASTSTART, VIDEO_HLS_ENABLED, HLS_LADDER, HLS_SEGMENT_SECONDS,
+    HLS_RETENTION_SECONDS
+)
 from uuid import UUID
+import time
 import logging
-
+import asyncio
+import hashlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+
+load_dotenv()
 logger = logging.getLogger(__name__)
 
+VIDEO_RENDER_WORKERS = int(os.getenv("VIDEO_RENDER_WORKERS", str(os.cpu_count() or 1)))
+VIDEO_COURSE_CONCURRENCY = int(os.getenv("VIDEO_COURSE_CONCURRENCY", str(VIDEO_RENDER_WORKERS)))
+MEDIA_EXECUTOR_WORKERS = int(os.getenv("MEDIA_EXECUTOR_WORKERS", "4"))
+MANIFEST_FILE = "manifest.json"
+# Written by clone_presentation; names the ai_request_id whose render a
+# presentation links to, and means it has no render of its own.
+CLONE_MARKER = "cloned_from"
+# "browser" screenshots slides in headless Chrome; "pillow" lays out the
+# known slide template in-process, with no browser and no network access.
+SLIDE_RASTERIZER = os.getenv("SLIDE_RASTERIZER", "browser")
+# "clips" encodes one retained clip per slide and concatenates them (allows
+# incremental rebuilds); "single_pass" encodes the whole course in one ffmpeg
+# run from the slide images, without intermediate clips.
+VIDEO_ASSEMBLY_MODE = os.getenv("VIDEO_ASSEMBLY_MODE", "clips")
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "6"))
+TTS_MAX_ATTEMPTS = int(os.getenv("TTS_MAX_ATTEMPTS", "3"))
+TTS_RETRY_BASE_DELAY = float(os.getenv("TTS_RETRY_BASE_DELAY", "1.0"))
+
+# Shared by every course being rendered; the work itself runs in Chrome and
+# ffmpeg subprocesses, so threads are enough to keep all cores busy.
+render_executor = ThreadPoolExecutor(max_workers=VIDEO_RENDER_WORKERS, thread_name_prefix="slide-render")
+
+# Runs blocking media orchestration (Selenium, ffmpeg, file hashing) so it
+# never stalls the event loop. Kept apart from render_executor, which the
+# jobs submitted here wait on.
+media_executor = ThreadPoolExecutor(max_workers=MEDIA_EXECUTOR_WORKERS, thread_name_prefix="media")
+
+
+async def run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(media_executor, functools.partial(func, *args, **kwargs))
+
 
 async def send_content(payload: CourseRequest, ai_request_id: UUID, model_api_host: str = "localhost"):
     print(f"Initiating content generation with payload: {payload}")
-    async with httpx.AsyncClient() as client:
-        print(f"Sending request to model API for ai_request_id: {ai_request_id}")
-        model_response = await client.post(
-            f"http://{model_api_host}:8001/generate/{ai_request_id}",
-            json=payload.dict()
-        )
-        print(f"Model API response status: {model_response.status_code}")
-        if model_response.status_code != 200:
-            raise Exception(f"Model API failed: {model_response.text}")
-        response_data = model_response.json()
-        print(f"Model API response: {response_data}")
-        return response_data
-
-async def generate_content(ai_request_id: UUID, language: str, response: dict):
+    print(f"Sending request to model API for ai_request_id: {ai_request_id}")
+    model_response = await request_with_retry(
+        "POST",
+        f"http://{model_api_host}:8001/generate/{ai_request_id}",
+        json=payload.dict(exclude={"encoding_profile", "theme", "regenerate"})
+    )
+    print(f"Model API response status: {model_response.status_code}")
+    if model_response.status_code != 200:
+        raise Exception(f"Model API failed: {model_response.text}")
+    response_data = model_response.json()
+    print(f"Model API response: {response_data}")
+    return response_data
+
+async def upload_video(ai_request_id: UUID, spring_boot_host: str = "localhost", metadata: dict = None):
+    """Stream the course video to Spring Boot, retrying failed connections."""
+    video_path = f"presentations/{ai_request_id}/{ai_request_id}.mp4"
+    return await upload_file(
+        f"http://{spring_boot_host}:8081/soft-skills/ai-resources/store/{ai_request_id}",
+        video_path,
+        field='video',
+        filename=f"{ai_request_id}.mp4",
+        content_type='video/mp4',
+        data={'courseRequest': json.dumps(metadata)} if metadata is not None else None
+    )
+
+def report_progress(progress, stage: str, fraction: float):
+    if progress is None:
+        return
+    try:
+        progress(stage, fraction)
+    except Exception as e:
+        logger.warning(f"Progress callback failed for stage {stage}: {e}")
+
+async def generate_content(ai_request_id: UUID, language: str, response: dict, progress=None, encoding_profile: str = None, theme: str = None):
     print(f"Generating content for ai_request_id: {ai_request_id}")
     course_path = Path(f"presentations/{ai_request_id}")
     course_path.mkdir(parents=True, exist_ok=True)
@@ -39,17 +107,23 @@ async def generate_content(ai_request_id: UUID, language: str, response: dict):
     print(f"Received model response: {response}")
 
     print("Generating slides...")
-    slides = await generate_slides(response.get('slides', []), str(course_path / "slides"))
+    report_progress(progress, "slides", 0.0)
+    slides = await generate_slides(response.get('slides', []), str(course_path / "slides"), theme)
+    # Slide titles and text, served by /slides and listed in the manifest.
+    await run_blocking(write_slides_data, course_path, response.get('slides', []))
     print(f"Generated slides: {slides}")
+    report_progress(progress, "slides", 1.0)
 
     print("Creating audio...")
+    report_progress(progress, "audio", 0.0)
     audio_files = await create_audio(response.get('speech', []), language, str(course_path / "audios"))
     print(f"Created audio files: {audio_files}")
+    report_progress(progress, "audio", 1.0)
 
     count = count_slides(slides)
 
     print("Generating video...")
-    video_path = generate_video(count, ai_request_id)
+    video_path = await run_blocking(generate_video, count, ai_request_id, progress, encoding_profile)
     print(f"Video generated: {video_path}")
 
     return {
@@ -58,38 +132,102 @@ async def generate_content(ai_request_id: UUID, language: str, response: dict):
         "video": video_path
     }
 
-async def check_and_generate_video(ai_request_id: UUID, language: str, response: dict, spring_boot_host: str = "localhost"):
+async def check_and_generate_video(ai_request_id: UUID, language: str, response: dict, spring_boot_host: str = "localhost", progress=None, encoding_profile: str = None, theme: str = None):
     video_path = f"presentations/{ai_request_id}/{ai_request_id}.mp4"
-    if os.path.exists(video_path):
+    manifest_path = f"presentations/{ai_request_id}/{MANIFEST_FILE}"
+    marker_path = f"presentations/{ai_request_id}/{CLONE_MARKER}"
+    if os.path.exists(marker_path):
+        # The video is another request's render of a possibly different
+        # response, so this course is rendered from scratch.
+        print(f"Dropping the linked render for ai_request_id: {ai_request_id}")
+        for path in (video_path, marker_path):
+            if os.path.exists(path):
+                os.remove(path)
+    if os.path.exists(video_path) and not os.path.exists(manifest_path):
+        # Rendered before clips were tracked; nothing to compare against.
         print(f"Video already exists for ai_request_id: {ai_request_id} at {video_path}")
     else:
-        print(f"No existing video found for ai_request_id: {ai_request_id}, generating...")
-        await generate_content(ai_request_id, language, response)
+        # Only slides whose HTML or audio changed are re-encoded.
+        print(f"Generating or refreshing video for ai_request_id: {ai_request_id}...")
+        await generate_content(ai_request_id, language, response, progress, encoding_profile, theme)
+    return await publish_video(ai_request_id, language, response, spring_boot_host, progress)
 
+async def publish_video(ai_request_id: UUID, language: str, response: dict, spring_boot_host: str = "localhost", progress=None):
+    video_path = f"presentations/{ai_request_id}/{ai_request_id}.mp4"
     # Send video to Spring Boot
-    async with httpx.AsyncClient() as client:
-        print(f"Sending video to Spring Boot for ai_request_id: {ai_request_id}")
-        with open(video_path, 'rb') as video_file:
-            files = {'video': (f"{ai_request_id}.mp4", video_file, 'video/mp4')}
-            metadata = {
-                "language": language,
-                "topic": response.get("topic", "Default Topic"),
-                "level": response.get("level", "beginner"),
-                "axes": response.get("axes", ["introduction", "examples"])
-            }
-            response = await client.post(
-                f"http://{spring_boot_host}:8081/soft-skills/ai-resources/store/{ai_request_id}",
-                files=files,
-                data={'courseRequest': json.dumps(metadata)}
-            )
-            print(f"Spring Boot response status: {response.status_code}")
-            if response.status_code != 200:
-                print(f"Failed to send video to Spring Boot: {response.text}")
-                raise Exception(f"Failed to send video to Spring Boot: {response.text}")
-            print(f"Spring Boot notified successfully: {response.json()}")
+    report_progress(progress, "upload", 0.0)
+    print(f"Sending video to Spring Boot for ai_request_id: {ai_request_id}")
+    metadata = {
+        "language": language,
+        "topic": response.get("topic", "Default Topic"),
+        "level": response.get("level", "beginner"),
+        "axes": response.get("axes", ["introduction", "examples"])
+    }
+    response = await upload_video(ai_request_id, spring_boot_host, metadata)
+    print(f"Spring Boot response status: {response.status_code}")
+    if response.status_code != 200:
+        print(f"Failed to send video to Spring Boot: {response.text}")
+        raise Exception(f"Failed to send video to Spring Boot: {response.text}")
+    print(f"Spring Boot notified successfully: {response.json()}")
+    report_progress(progress, "upload", 1.0)
     return {"video": video_path}
 
-async def create_audio(speech, language: str, path: str):
+async def request_course_content(payload: CourseRequest, ai_request_id: UUID, model_api_host: str = "localhost"):
+    """send_content, deduplicated by request_key.
+
+    Identical requests reuse the recorded model output until it expires
+    (or always ask again with regenerate), and concurrent identical
+    requests share a single model call.
+    """
+    key = request_key(payload)
+    cached = None if payload.regenerate else await run_blocking(generation_cache.response, key)
+    if cached is not None:
+        print(f"Reusing model output of an identical request for ai_request_id: {ai_request_id}")
+        return cached
+
+    async def call():
+        response = await send_content(payload, ai_request_id, model_api_host)
+        await run_blocking(generation_cache.record, key, response=response)
+        return response
+
+    response, _ = await single_flight.run(f"model:{key}", call)
+    return response
+
+async def produce_course_video(ai_request_id: UUID, payload: CourseRequest, response: dict, spring_boot_host: str = "localhost", progress=None, encoding_profile: str = None):
+    """check_and_generate_video, deduplicated by render_key.
+
+    When the same request and model response were already rendered, the
+    artifacts are linked under ai_request_id instead of rendering again;
+    concurrent identical renders wait for one and then do the same. A
+    changed response renders in place, reusing unchanged slide clips.
+    """
+    key = render_key(payload, response, encoding_profile)
+    entry = await run_blocking(generation_cache.lookup, key)
+    if entry and entry["ai_request_id"] != str(ai_request_id):
+        print(f"Reusing the render of {entry['ai_request_id']} for ai_request_id: {ai_request_id}")
+        return await publish_alias(UUID(entry["ai_request_id"]), ai_request_id, payload.language, response, spring_boot_host, progress)
+
+    async def render():
+        result = await check_and_generate_video(ai_request_id, payload.language, response, spring_boot_host, progress, encoding_profile, payload.theme)
+        await run_blocking(generation_cache.record, key, ai_request_id)
+        return ai_request_id, result
+
+    (source, result), leader = await single_flight.run(f"render:{key}", render)
+    if leader or source == ai_request_id:
+        return result
+    return await publish_alias(source, ai_request_id, payload.language, response, spring_boot_host, progress)
+
+def voice_for_language(language: str) -> str:
+    voice = "en-US-AriaNeural"
+    if language == "fr":
+        voice = "fr-FR-DeniseNeural"
+    elif language == "es":
+        voice = "es-ES-ElviraNeural"
+    elif language == "it":
+        voice = "it-IT-ElsaNeural"
+    return voice
+
+async def create_audio(speech, language: str, path: str, concurrency: int = TTS_CONCURRENCY):
     print(f"Creating audio with language: {language}, path: {path}")
     os.makedirs(path, exist_ok=True)
     print(f"Created audio directory: {path}")
@@ -101,7 +239,8 @@ async def create_audio(speech, language: str, path: str):
         speech_data = speech
     print(f"Speech data: {speech_data}")
 
-    generated_files = []
+    voice = voice_for_language(language)
+    jobs = []
 
     for slide in speech_data:
         slide_id = slide.get("id")
@@ -112,46 +251,66 @@ async def create_audio(speech, language: str, path: str):
         if not script or script == "Explication indisponible":
             continue
 
-        file_name = f"audio{slide_id}.mp3"
-        file_path = os.path.join(path, file_name)
+        jobs.append((slide_id, script, f"audio{slide_id}.mp3"))
 
-        voice = "en-US-AriaNeural"
-        if language == "fr":
-            voice = "fr-FR-DeniseNeural"
-        elif language == "es":
-            voice = "es-ES-ElviraNeural"
-        elif language == "it":
-            voice = "it-IT-ElsaNeural"
-
-        print(f"Generating audio for slide {slide_id} with voice {voice}")
-        await generate_audio(
-            speech_text=script,
-            file_name=file_name,
-            file_path=path,
-            voice=voice
-        )
-        print(f"Audio generated for slide {slide_id}")
-
-        generated_files.append({
-            "slide_id": slide_id,
-            "audio_file": file_path
-        })
+    # TTS is network bound: synthesize up to `concurrency` slides at once.
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    return generated_files
+    async def synthesize(slide_id, script: str, file_name: str):
+        file_path = os.path.join(path, file_name)
+        if await run_blocking(audio_cache.fetch, voice, script, file_path):
+            print(f"Audio for slide {slide_id} served from TTS cache")
+            return
+        async with semaphore:
+            print(f"Generating audio for slide {slide_id} with voice {voice}")
+            await generate_audio_with_retry(
+                speech_text=script,
+                file_name=file_name,
+                file_path=path,
+                voice=voice
+            )
+            print(f"Audio generated for slide {slide_id}")
+        await run_blocking(audio_cache.store, voice, script, file_path)
+
+    await asyncio.gather(*(synthesize(*job) for job in jobs))
+
+    return [
+        {"slide_id": slide_id, "audio_file": os.path.join(path, file_name)}
+        for slide_id, _, file_name in jobs
+    ]
+
+async def generate_audio_with_retry(speech_text: str, file_name: str, file_path: str, voice: str = "en-US-AriaNeural"):
+    for attempt in range(1, TTS_MAX_ATTEMPTS + 1):
+        try:
+            return await generate_audio(speech_text, file_name, file_path, voice)
+        except Exception as e:
+            if attempt == TTS_MAX_ATTEMPTS:
+                raise
+            delay = TTS_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+            logger.warning(f"TTS failed for {file_name} (attempt {attempt}/{TTS_MAX_ATTEMPTS}): {e}; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
 
 async def generate_audio(speech_text: str, file_name: str, file_path: str, voice: str = "en-US-AriaNeural"):
     os.makedirs(file_path, exist_ok=True)
     full_path = os.path.join(file_path, file_name)
     communicate = edge_tts.Communicate(speech_text, voice)
-    await communicate.save(full_path)
+    # Write beside the target and swap it in, so an existing file that is
+    # hard-linked into the TTS cache is replaced rather than overwritten.
+    tmp_path = f"{full_path}.part"
+    await communicate.save(tmp_path)
+    os.replace(tmp_path, full_path)
     return full_path
 
-async def generate_slides(slides, path: str):
+async def generate_slides(slides, path: str, theme: str = None):
     print(f"Starting generate_slides with slides: {slides} and path: {path}")
     output_dir = Path(path)
     output_dir.mkdir(exist_ok=True)
     print(f"Created output directory: {output_dir}")
 
+    # Every slide links to one shared stylesheet instead of embedding it.
+    stylesheet = write_stylesheet(output_dir.parent, theme)
+    print(f"Stylesheet written: {stylesheet}")
+
     generated_files = []
 
     for slide in slides:
@@ -169,8 +328,11 @@ async def generate_slides(slides, path: str):
         filepath = output_dir / filename
         print(f"Writing to file: {filepath}")
 
-        with open(filepath, 'w', encoding='utf-8') as html_file:
+        # Replaced, not rewritten: the old file may be linked into a cloned presentation.
+        tmp_path = output_dir / f"{filename}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as html_file:
             html_file.write(html_content)
+        os.replace(tmp_path, filepath)
         print(f"File written successfully: {filepath}")
 
         generated_files.append({
@@ -181,114 +343,48 @@ async def generate_slides(slides, path: str):
     print(f"Returning {len(generated_files)} generated files")
     return generated_files
 
+def write_slides_data(course_path: Path, slides: list):
+    path = course_path / "slides.json"
+    tmp_path = course_path / "slides.json.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"slides": slides}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
 def count_slides(slides):
     return len(slides)
 
 def generate_html_slide(slide_data):
-    html_template = f"""<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{slide_data.get('title', f"Slide {slide_data['id']}")}</title>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/themes/prism-tomorrow.min.css">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-core.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/autoloader/prism-autoloader.min.js"></script>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 20px; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; border-radius: 15px; box-shadow: 0 20px 60px rgba(0, 0, 0, 0.1); overflow: hidden; animation: slideIn 0.6s ease-out; }}
-        @keyframes slideIn {{ from {{ opacity: 0; transform: translateY(30px); }} to {{ opacity: 1; transform: translateY(0); }} }}
-        .header {{ background: linear-gradient(135deg, #2c3e50 0%, #3498db 100%); color: white; padding: 30px 40px; text-align: center; position: relative; overflow: hidden; }}
-        .header::before {{ content: ''; position: absolute; top: 0; left: 0; right: 0; bottom: 0; background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><circle cx="50" cy="50" r="2" fill="rgba(255,255,255,0.1)"/></svg>') repeat; opacity: 0.3; }}
-        .slide-number {{ position: absolute; top: 20px; right: 30px; background: rgba(255, 255, 255, 0.2); padding: 8px 15px; border-radius: 20px; font-size: 14px; font-weight: 500; }}
-        .title {{ font-size: 2.5em; font-weight: 700; margin-bottom: 10px; position: relative; z-index: 1; }}
-        .content {{ padding: 40px; }}
-        .summary {{ background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); border-left: 5px solid #3498db; padding: 25px; margin-bottom: 30px; border-radius: 10px; box-shadow: 0 5px 15px rgba(0, 0, 0, 0.08); }}
-        .summary h2 {{ color: #2c3e50; font-size: 1.4em; margin-bottom: 20px; display: flex; align-items: center; }}
-        .summary h2::before {{ content: "📚"; margin-right: 10px; font-size: 1.2em; }}
-        .summary ul {{ list-style: none; padding-left: 0; }}
-        .summary li {{ margin: 15px 0; padding: 12px 0; border-bottom: 1px solid #dee2e6; position: relative; padding-left: 25px; }}
-        .summary li::before {{ content: "▶"; position: absolute; left: 0; color: #3498db; font-size: 0.8em; }}
-        .summary li:last-child {{ border-bottom: none; }}
-        .summary strong {{ color: #2c3e50; font-weight: 600; }}
-        .code-section {{ background: #1e1e1e; border-radius: 10px; overflow: hidden; box-shadow: 0 10px 30px rgba(0, 0, 0, 0.2); margin-top: 30px; }}
-        .code-header {{ background: linear-gradient(135deg, #FF6B6B 0%, #4ECDC4 100%); color: white; padding: 15px 25px; font-weight: 600; display: flex; align-items: center; justify-content: space-between; }}
-        .code-header::before {{ content: "☕"; margin-right: 10px; font-size: 1.2em; }}
-        .code-lang {{ background: rgba(255, 255, 255, 0.2); padding: 4px 12px; border-radius: 15px; font-size: 0.9em; }}
-        .code-content {{ padding: 0; }}
-        .code-content pre {{ margin: 0; padding: 25px; background: #1e1e1e; color: #f8f8f2; font-family: 'Consolas', 'Monaco', 'Courier New', monospace; font-size: 14px; line-height: 1.5; overflow-x: auto; }}
-        .code-content pre code {{ background: none; padding: 0; border-radius: 0; }}
-        .navigation {{ background: #f8f9fa; padding: 20px 40px; border-top: 1px solid #dee2e6; display: flex; justify-content: space-between; align-items: center; }}
-        .nav-button {{ background: linear-gradient(135deg, #3498db 0%, #2980b9 100%); color: white; border: none; padding: 12px 20px; border-radius: 25px; cursor: pointer; font-weight: 500; transition: all 0.3s ease; text-decoration: none; display: inline-flex; align-items: center; gap: 8px; }}
-        .nav-button:hover {{ transform: translateY(-2px); box-shadow: 0 5px 15px rgba(52, 152, 219, 0.4); }}
-        .nav-button:disabled {{ background: #bdc3c7; cursor: not-allowed; transform: none; box-shadow: none; }}
-        .slide-indicator {{ background: #e9ecef; border-radius: 15px; padding: 8px 16px; color: #6c757d; font-size: 0.9em; font-weight: 500; }}
-        .unavailable {{ color: #e74c3c; font-style: italic; text-align: center; padding: 20px; background: #fdf2f2; border-radius: 8px; border: 1px solid #f5c6cb; }}
-        @media (max-width: 768px) {{ .container {{ margin: 10px; border-radius: 10px; }} .header {{ padding: 20px; }} .title {{ font-size: 2em; }} .content {{ padding: 20px; }} .navigation {{ padding: 15px 20px; flex-direction: column; gap: 15px; }} .nav-button {{ width: 100%; justify-content: center; }} }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <div class="slide-number">Slide {slide_data['id']}</div>
-        </div>
-        <div class="content">
-            <div class="summary">
-                <h2>Résumé</h2>
-                {slide_data.get('summary', 'Résumé indisponible')}
-            </div>
-            <div class="code-section">
-                <div class="code-header">
-                    <span>Code Java</span>
-                    <span class="code-lang">Java</span>
-                </div>
-                <div class="code-content">
-                    {slide_data.get('example_code', '<pre><code>// Code indisponible</code></pre>')}
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
-    return html_template
+    return render_slide(slide_data)
 
 def capture_slide(html_path: str, output_png: str):
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--disable-software-rasterizer')
-    options.add_argument('--disable-background-timer-throttling')
-    options.add_argument('--disable-renderer-backgrounding')
-    options.add_argument('--disable-backgrounding-occluded-windows')
-
-    driver = None
     try:
-        driver = webdriver.Chrome(options=options)
-        abs_path = os.path.abspath(html_path)
-        driver.get(f"file://{abs_path}")
-        time.sleep(3)
-        driver.set_window_size(1920, 1080)
-        time.sleep(1)
-        driver.save_screenshot(output_png)
+        if SLIDE_RASTERIZER == "pillow":
+            render_slide_png(html_path, output_png)
+        else:
+            browser_pool.capture(html_path, output_png)
         print(f"Screenshot saved: {output_png}")
     except Exception as e:
         print(f"Error capturing slide {html_path}: {e}")
         raise
-    finally:
-        if driver:
-            driver.quit()
 
-def create_video_from_image_audio(image: str, audio: str, output: str):
+def encoding_args(profile: dict) -> list:
+    return [
+        '-c:v', 'libx264', '-tune', 'stillimage',
+        '-preset', profile["preset"], '-crf', str(profile["crf"]), '-r', str(profile["fps"]),
+        '-c:a', 'aac', '-b:a', profile["audio_bitrate"],
+        '-vf', f'scale={profile["width"]}:{profile["height"]}',
+        '-pix_fmt', 'yuv420p',
+    ]
+
+def faststart_args() -> list:
+    return ['-movflags', '+faststart'] if VIDEO_FASTSTART else []
+
+def create_video_from_image_audio(image: str, audio: str, output: str, profile: dict = None):
+    profile = profile or get_encoding_profile()
     try:
         cmd = [
-            'ffmpeg', '-y', '-loop', '1', '-i', image, '-i', audio,
-            '-c:v', 'libx264', '-tune', 'stillimage', '-c:a', 'aac', '-b:a', '128k',
-            '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2',
-            '-pix_fmt', 'yuv420p', '-shortest', output
+            'ffmpeg', '-y', '-loop', '1', '-framerate', str(profile["fps"]), '-i', image, '-i', audio,
+            *encoding_args(profile), '-shortest', output
         ]
         subprocess.run(cmd, check=True, capture_output=True, text=True)
         print(f"Video created: {output}")
@@ -298,6 +394,9 @@ def create_video_from_image_audio(image: str, audio: str, output: str):
         raise
 
 def concat_videos(video_list: list, output_file: str):
+    # Encoded next to the final video and moved over it, which may be
+    # hard-linked into a cloned presentation.
+    tmp_output = output_file.replace(".mp4", ".tmp.mp4")
     try:
         output_dir = os.path.dirname(output_file)
         videos_txt = os.path.join(output_dir, 'videos.txt')
@@ -305,64 +404,362 @@ def concat_videos(video_list: list, output_file: str):
             for video in video_list:
                 abs_video_path = os.path.abspath(video)
                 f.write(f"file '{abs_video_path}'\n")
-        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', videos_txt, '-c', 'copy', output_file]
+        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', videos_txt, '-c', 'copy', *faststart_args(), tmp_output]
         subprocess.run(cmd, check=True, capture_output=True, text=True)
+        os.replace(tmp_output, output_file)
         print(f"Final video created: {output_file}")
         os.remove(videos_txt)
     except subprocess.CalledProcessError as e:
         print(f"Error concatenating videos: {e}")
         print(f"FFmpeg stderr: {e.stderr}")
         raise
+    finally:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+
+def probe_duration(media: str) -> float:
+    cmd = [
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', media
+    ]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return float(result.stdout.strip())
+
+def assemble_single_pass(frames: list, output_file: str, profile: dict = None):
+    """Encode the course video in one ffmpeg run from (image, audio) pairs.
+
+    Each image is shown for the duration of its audio via the concat
+    demuxer, so no per-slide clips are written to disk.
+    """
+    profile = profile or get_encoding_profile()
+    output_dir = os.path.dirname(output_file)
+    tmp_output = output_file.replace(".mp4", ".tmp.mp4")
+    images_txt = os.path.join(output_dir, 'images.txt')
+    audios_txt = os.path.join(output_dir, 'audios.txt')
+    try:
+        with open(images_txt, 'w') as images, open(audios_txt, 'w') as audios:
+            for image, audio in frames:
+                images.write(f"file '{os.path.abspath(image)}'\n")
+                images.write(f"duration {probe_duration(audio):.3f}\n")
+                audios.write(f"file '{os.path.abspath(audio)}'\n")
+            # The concat demuxer only honours the last duration if the final
+            # image is listed once more.
+            images.write(f"file '{os.path.abspath(frames[-1][0])}'\n")
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat', '-safe', '0', '-i', images_txt,
+            '-f', 'concat', '-safe', '0', '-i', audios_txt,
+            '-map', '0:v', '-map', '1:a',
+            *encoding_args(profile), *faststart_args(), '-shortest', tmp_output
+        ]
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        os.replace(tmp_output, output_file)
+        print(f"Final video created: {output_file}")
+    except subprocess.CalledProcessError as e:
+        print(f"Error assembling video {output_file}: {e}")
+        print(f"FFmpeg stderr: {e.stderr}")
+        raise
+    finally:
+        for listing in (images_txt, audios_txt, tmp_output):
+            if os.path.exists(listing):
+                os.remove(listing)
+
+def package_hls(video_file: str, hls_dir: str, version: str, profile: dict = None) -> str:
+    """Segment the course video into an HLS bitrate ladder.
+
+    Output goes to hls_dir/<version>/ (master.m3u8 plus one directory per
+    rendition), so segment URLs never change content and can be cached
+    forever. hls_dir/current names the version being served; the version it
+    replaces is kept for HLS_RETENTION_SECONDS for players still on it.
+    """
+    profile = profile or get_encoding_profile()
+    renditions = [r for r in HLS_LADDER if r["height"] <= profile["height"]] or [HLS_LADDER[-1]]
+    target = os.path.join(hls_dir, version)
+    staging = f"{target}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    n = len(renditions)
+    graph = f"[0:v]split={n}" + "".join(f"[v{i}]" for i in range(n)) + ";" + ";".join(
+        f"[v{i}]scale=-2:{r['height']}[v{i}out]" for i, r in enumerate(renditions)
+    )
+    cmd = ['ffmpeg', '-y', '-i', video_file, '-filter_complex', graph]
+    for i in range(n):
+        cmd += ['-map', f'[v{i}out]', '-map', '0:a']
+    for i, r in enumerate(renditions):
+        cmd += [
+            f'-c:v:{i}', 'libx264', f'-b:v:{i}', r["video_bitrate"],
+            f'-c:a:{i}', 'aac', f'-b:a:{i}', r["audio_bitrate"],
+        ]
+    cmd += [
+        '-preset', profile["preset"], '-pix_fmt', 'yuv420p',
+        '-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})',
+        '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', os.path.join(staging, '%v', 'segment%03d.ts'),
+        '-master_pl_name', 'master.m3u8',
+        '-var_stream_map', ' '.join(f"v:{i},a:{i},name:{r['name']}" for i, r in enumerate(renditions)),
+        os.path.join(staging, '%v', 'index.m3u8')
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error packaging HLS for {video_file}: {e}")
+        print(f"FFmpeg stderr: {e.stderr}")
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    pointer = os.path.join(hls_dir, 'current')
+    try:
+        with open(pointer, 'r') as f:
+            previous = f.read().strip()
+    except FileNotFoundError:
+        previous = None
+    with open(f"{pointer}.tmp", 'w') as f:
+        f.write(version)
+    os.replace(f"{pointer}.tmp", pointer)
+    if previous and previous != version and os.path.isdir(os.path.join(hls_dir, previous)):
+        # The retention period counts from now, not from when it was packaged.
+        os.utime(os.path.join(hls_dir, previous))
+    prune_hls(hls_dir, version)
+    print(f"HLS ladder packaged: {target}")
+    return target
+
+def prune_hls(hls_dir: str, current: str):
+    """Remove HLS versions superseded more than HLS_RETENTION_SECONDS ago."""
+    cutoff = time.time() - HLS_RETENTION_SECONDS
+    for name in os.listdir(hls_dir):
+        path = os.path.join(hls_dir, name)
+        if name == current or not os.path.isdir(path):
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+def try_package_hls(video_file: str, hls_dir: str, version: str, profile: dict = None):
+    """HLS is an extra delivery format: a failure is logged and the MP4 kept."""
+    try:
+        package_hls(video_file, hls_dir, version, profile)
+    except Exception as e:
+        logger.error(f"HLS packaging failed for {video_file}, serving the MP4 only: {e}")
 
-def generate_video(nbr_slides, ai_request_id: UUID):
+def render_slide_clip(html: str, audio: str, image: str, video: str, profile: dict = None):
+    tmp_video = video.replace(".mp4", ".tmp.mp4")
+    try:
+        capture_slide(html, image)
+        create_video_from_image_audio(image, audio, tmp_video, profile)
+        os.replace(tmp_video, video)
+    finally:
+        for path in (image, tmp_video):
+            if os.path.exists(path):
+                os.remove(path)
+    return video
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(output_dir: str) -> dict:
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"slides": {}, "video": None}
+    manifest.setdefault("slides", {})
+    manifest.setdefault("video", None)
+    return manifest
+
+def save_manifest(output_dir: str, manifest: dict):
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def generate_video(nbr_slides, ai_request_id: UUID, progress=None, encoding_profile: str = None):
     slides_dir = f'presentations/{ai_request_id}/slides'
     audio_dir = f'presentations/{ai_request_id}/audios'
     output_dir = f'presentations/{ai_request_id}'
+    clips_dir = f'{output_dir}/clips'
+    single_pass = VIDEO_ASSEMBLY_MODE == "single_pass"
+    profile = get_encoding_profile(encoding_profile)
 
     if not os.path.exists(slides_dir):
         raise FileNotFoundError(f"Slides directory not found: {slides_dir}")
     if not os.path.exists(audio_dir):
         raise FileNotFoundError(f"Audio directory not found: {audio_dir}")
+    os.makedirs(clips_dir, exist_ok=True)
+
+    # The manifest maps each slide to the hashes of the HTML and audio its
+    # retained clip was rendered from, so only changed slides are re-encoded.
+    # Slides are styled by the shared stylesheet, so a theme change
+    # invalidates every clip.
+    manifest = load_manifest(output_dir)
+    entries = manifest["slides"]
+    stylesheet = f"{output_dir}/{STYLESHEET_NAME}"
+    stylesheet_hash = file_sha256(stylesheet) if os.path.exists(stylesheet) else None
+
+    slides = []
+    for i in range(1, int(nbr_slides) + 1):
+        html = f"{slides_dir}/slide{i}.html"
+        image = f"{output_dir}/slide{i}.png"
+        audio = f"{audio_dir}/audio{i}.mp3"
+        video = f"{clips_dir}/slide{i}.mp4"
+
+        if not os.path.exists(html):
+            print(f"Warning: HTML file not found: {html}")
+            continue
+        if not os.path.exists(audio):
+            print(f"Warning: Audio file not found: {audio}")
+            continue
 
-    videos = []
-    try:
-        for i in range(1, int(nbr_slides) + 1):
-            html = f"{slides_dir}/slide{i}.html"
-            image = f"{output_dir}/slide{i}.png"
-            audio = f"{audio_dir}/audio{i}.mp3"
-            video = f"{output_dir}/slide{i}.mp4"
-
-            if not os.path.exists(html):
-                print(f"Warning: HTML file not found: {html}")
-                continue
-            if not os.path.exists(audio):
-                print(f"Warning: Audio file not found: {audio}")
-                continue
+        # Clips are only reusable (and -c copy concatenable) with identical
+        # encoding settings, so the profile is part of each entry.
+        entry = {
+            "html": file_sha256(html), "audio": file_sha256(audio), "stylesheet": stylesheet_hash,
+            "profile": profile, "clip": video
+        }
+        slides.append((i, html, audio, image, entry))
+
+    if not slides:
+        raise ValueError("No videos were generated")
+
+    final_video = f"{output_dir}/{ai_request_id}.mp4"
+    signature = hashlib.sha256(json.dumps(
+        {
+            "mode": VIDEO_ASSEMBLY_MODE, "profile": profile, "stylesheet": stylesheet_hash,
+            "slides": [[i, entry["html"], entry["audio"]] for i, _, _, _, entry in slides]
+        },
+        sort_keys=True
+    ).encode('utf-8')).hexdigest()
+    hls_dir = f"{output_dir}/hls"
+    hls_version = signature[:16]
+    if manifest["video"] == signature and os.path.exists(final_video):
+        print(f"Course video is up to date: {final_video}")
+        if VIDEO_HLS_ENABLED and not os.path.exists(f"{hls_dir}/{hls_version}/master.m3u8"):
+            try_package_hls(final_video, hls_dir, hls_version, profile)
+        return final_video
+
+    # Slides are independent until concatenation, so they are captured and
+    # encoded on the shared render pool, at most VIDEO_COURSE_CONCURRENCY
+    # at a time for this course.
+    course_slots = threading.BoundedSemaphore(VIDEO_COURSE_CONCURRENCY)
 
+    def render(i: int, html: str, audio: str, image: str, video: str):
+        try:
             print(f"Processing slide {i}...")
-            capture_slide(html, image)
-            create_video_from_image_audio(image, audio, video)
-            videos.append(video)
-            if os.path.exists(image):
-                os.remove(image)
+            if single_pass:
+                return capture_slide(html, image)
+            return render_slide_clip(html, audio, image, video, profile)
+        finally:
+            course_slots.release()
 
-        if not videos:
-            raise ValueError("No videos were generated")
+    futures = {}
+    rendered = []
 
-        final_video = f"{output_dir}/{ai_request_id}.mp4"
-        concat_videos(videos, final_video)
-        for v in videos:
-            if os.path.exists(v):
-                os.remove(v)
+    def slide_done(_):
+        # Called from render threads; list.append is atomic under the GIL.
+        rendered.append(True)
+        report_progress(progress, "video", len(rendered) / max(1, len(futures)))
+
+    report_progress(progress, "video", 0.0)
+    try:
+        for i, html, audio, image, entry in slides:
+            if not single_pass and entries.get(str(i)) == entry and os.path.exists(entry["clip"]):
+                print(f"Slide {i} unchanged, reusing {entry['clip']}")
+                continue
+            entries.pop(str(i), None)
+            course_slots.acquire()
+            futures[str(i)] = (entry, render_executor.submit(render, i, html, audio, image, entry["clip"]))
+
+        for _, future in futures.values():
+            future.add_done_callback(slide_done)
+
+        # Results are collected in slide order, whatever order they finish in.
+        for key, (entry, future) in futures.items():
+            future.result()
+            if not single_pass:
+                entries[key] = entry
+
+        if single_pass:
+            assemble_single_pass([(image, audio) for _, _, audio, image, _ in slides], final_video, profile)
+        else:
+            concat_videos([entry["clip"] for *_, entry in slides], final_video)
+        if VIDEO_HLS_ENABLED:
+            try_package_hls(final_video, hls_dir, hls_version, profile)
+        manifest["video"] = signature
+        report_progress(progress, "video", 1.0)
+
+        # Drop clips for slides the course no longer has.
+        current = {str(i) for i, *_ in slides}
+        for key in [key for key in entries if key not in current]:
+            stale = entries.pop(key)
+            if os.path.exists(stale["clip"]):
+                os.remove(stale["clip"])
 
         print(f"Course video generated successfully: {final_video}")
         return final_video
-    except Exception as e:
-        for v in videos:
-            if os.path.exists(v):
-                os.remove(v)
-        raise e
+    except Exception:
+        for _, future in futures.values():
+            future.cancel()
+        wait([future for _, future in futures.values()])
+        if not single_pass:
+            for key, (entry, future) in futures.items():
+                if not future.cancelled() and future.exception() is None:
+                    entries[key] = entry
+        raise
+    finally:
+        for _, _, _, image, _ in slides:
+            if os.path.exists(image):
+                os.remove(image)
+        save_manifest(output_dir, manifest)
     
+def clone_presentation(source_id: UUID, target_id: UUID) -> str:
+    """Hard-link a rendered presentation under another ai_request_id.
+
+    Clips and the render manifest stay with the source, so the clone is
+    served and uploaded as-is and never re-encoded in place; a later render
+    under target_id drops the linked video (see CLONE_MARKER) and starts
+    over. Every writer under presentations/ replaces files rather than
+    rewriting them, so a render on either side never changes the other's.
+    """
+    source = f"presentations/{source_id}"
+    target = f"presentations/{target_id}"
+    for name in ("slides", "audios", "hls", "clips"):
+        shutil.rmtree(os.path.join(target, name), ignore_errors=True)
+    for name in (MANIFEST_FILE, CLONE_MARKER):
+        if os.path.exists(os.path.join(target, name)):
+            os.remove(os.path.join(target, name))
+
+    for root, dirs, files in os.walk(source):
+        relative = os.path.relpath(root, source)
+        if relative == ".":
+            dirs[:] = [name for name in dirs if name != "clips"]
+        for name in files:
+            if relative == "." and name in (MANIFEST_FILE, CLONE_MARKER, f"{source_id}.mp4"):
+                continue
+            if name.endswith((".png", ".txt")) or ".tmp" in name:
+                continue  # frames, ffmpeg listings and partial writes of a render
+            place_file(os.path.join(root, name), os.path.join(target, relative, name))
+    video = f"{target}/{target_id}.mp4"
+    place_file(f"{source}/{source_id}.mp4", video)
+    with open(os.path.join(target, CLONE_MARKER), 'w') as f:
+        f.write(str(source_id))
+    print(f"Cloned presentation {source_id} to {target_id}")
+    return video
+
+async def publish_alias(source_id: UUID, alias_id: UUID, language: str, response: dict, spring_boot_host: str = "localhost", progress=None):
+    """Serve an identical course under alias_id from source_id's render."""
+    await run_blocking(clone_presentation, source_id, alias_id)
+    return await publish_video(alias_id, language, response, spring_boot_host, progress)
+
 async def transfer_video(ai_request_id: UUID, spring_boot_host: str = "localhost") -> dict:
     # """
     # Transfer a generated video to Spring Boot for the given ai_request_id.
@@ -383,19 +780,13 @@ async def transfer_video(ai_request_id: UUID, spring_boot_host: str = "localhost
             logger.error(f"Video file not found at {video_path}")
             raise HTTPException(status_code=404, detail=f"Video file not found at {video_path}")
 
-        async with httpx.AsyncClient() as client:
-            logger.info(f"Sending video to Spring Boot for ai_request_id: {ai_request_id}")
-            with open(video_path, 'rb') as video_file:
-                files = {'video': (f"{ai_request_id}.mp4", video_file, 'video/mp4')}
-                response = await client.post(
-                    f"http://{spring_boot_host}:8081/soft-skills/ai-resources/store/{ai_request_id}",
-                    files=files
-)
-                logger.info(f"Spring Boot response status: {response.status_code}")
-                if response.status_code != 200:
-                    logger.error(f"Failed to send video to Spring Boot: {response.text}")
-                    raise HTTPException(status_code=response.status_code, detail=f"Failed to send video to Spring Boot: {response.text}")
-                logger.info(f"Spring Boot notified successfully: {response.json()}")
+        logger.info(f"Sending video to Spring Boot for ai_request_id: {ai_request_id}")
+        response = await upload_video(ai_request_id, spring_boot_host)
+        logger.info(f"Spring Boot response status: {response.status_code}")
+        if response.status_code != 200:
+            logger.error(f"Failed to send video to Spring Boot: {response.text}")
+            raise HTTPException(status_code=response.status_code, detail=f"Failed to send video to Spring Boot: {response.text}")
+        logger.info(f"Spring Boot notified successfully: {response.json()}")
         return {"message": "Video transferred successfully", "spring_boot_response": response.json(), "ai_request_id": str(ai_request_id)}
     except HTTPException as e:
         raise e
@@ -0,0 +1,217 @@
+import os
+import re
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+CHUNK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+def make_etag(mtime_ns: int, size: int) -> str:
+    return f'"{mtime_ns:x}-{size:x}"'
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_ranges(header: str, size: int) -> list[tuple[int, int]] | None:
+    """Parse a ``Range`` header into inclusive (start, end) pairs.
+
+    Returns None when the header should be ignored (not a byte range) and
+    an empty list when no requested range overlaps the representation.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+    ranges = []
+    for part in spec.split(","):
+        match = _RANGE_RE.match(part)
+        if not match:
+            return None
+        first, last = match.groups()
+        if not first and not last:
+            return None
+        if not first:
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+        if start < size:
+            ranges.append((start, end))
+    return ranges
+
+
+def _requested_ranges(request: Request, etag: str, last_modified: str, size: int):
+    range_header = request.headers.get("range")
+    if not range_header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() not in (etag, last_modified):
+        return None
+    return parse_ranges(range_header, size)
+
+
+def _not_satisfiable(size: int, headers: dict) -> Response:
+    headers = {**headers, "Content-Range": f"bytes */{size}"}
+    return Response(status_code=416, headers=headers)
+
+
+def _multipart_parts(ranges, size: int, media_type: str, boundary: str):
+    for start, end in ranges:
+        head = (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("latin-1")
+        yield head, (start, end)
+
+
+def _multipart_length(ranges, size: int, media_type: str, boundary: str) -> int:
+    total = len(f"--{boundary}--\r\n")
+    for head, (start, end) in _multipart_parts(ranges, size, media_type, boundary):
+        total += len(head) + (end - start + 1) + 2
+    return total
+
+
+def _read_at(fd: int, offset: int, length: int) -> bytes:
+    return os.pread(fd, length, offset)
+
+
+async def _iter_file_ranges(path: str, ranges, size: int, media_type: str, boundary: str | None):
+    fd = await run_in_threadpool(os.open, path, os.O_RDONLY)
+    try:
+        for head, (start, end) in (
+            _multipart_parts(ranges, size, media_type, boundary) if boundary else [(b"", ranges[0])]
+        ):
+            if head:
+                yield head
+            offset = start
+            while offset <= end:
+                chunk = await run_in_threadpool(_read_at, fd, offset, min(CHUNK_SIZE, end - offset + 1))
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+            if boundary:
+                yield b"\r\n"
+        if boundary:
+            yield f"--{boundary}--\r\n".encode("latin-1")
+    finally:
+        os.close(fd)
+
+
+def serve_file(request: Request, path: str, media_type: str, cache_control: str = DEFAULT_CACHE_CONTROL) -> Response:
+    """Serve a file with ETag/Last-Modified validation and byte-range support.
+
+    Whole-file responses go through FileResponse, which hands the path to
+    the server (``http.response.pathsend``) where supported; ranges are
+    read in large chunks off the event loop.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    size = stat.st_size
+    etag = make_etag(stat.st_mtime_ns, size)
+    last_modified = http_date(stat.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+    }
+
+    if is_not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    ranges = _requested_ranges(request, etag, last_modified, size)
+    if ranges is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+    if not ranges:
+        return _not_satisfiable(size, headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_file_ranges(path, ranges, size, media_type, None),
+            status_code=206, media_type=media_type, headers=headers
+        )
+
+    boundary = uuid.uuid4().hex
+    headers["Content-Length"] = str(_multipart_length(ranges, size, media_type, boundary))
+    return StreamingResponse(
+        _iter_file_ranges(path, ranges, size, media_type, boundary),
+        status_code=206, media_type=f"multipart/byteranges; boundary={boundary}", headers=headers
+    )
+
+
+def serve_bytes(request: Request, content: bytes, media_type: str, etag: str, mtime: float,
+                cache_control: str = DEFAULT_CACHE_CONTROL) -> Response:
+    """In-memory counterpart of serve_file, for content rewritten on the way out."""
+    size = len(content)
+    last_modified = http_date(mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+    }
+
+    if is_not_modified(request, etag, mtime):
+        return Response(status_code=304, headers=headers)
+
+    ranges = _requested_ranges(request, etag, last_modified, size)
+    if ranges is None:
+        return Response(content=content, media_type=media_type, headers=headers)
+    if not ranges:
+        return _not_satisfiable(size, headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(content=content[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+    boundary = uuid.uuid4().hex
+    body = b"".join(
+        head + content[start:end + 1] + b"\r\n"
+        for head, (start, end) in _multipart_parts(ranges, size, media_type, boundary)
+    ) + f"--{boundary}--\r\n".encode("latin-1")
+    return Response(
+        content=body, status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}", headers=headers
+    )
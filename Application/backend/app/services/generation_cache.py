@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from dotenv import load_dotenv
+
+from app.configs.video import get_encoding_profile
+from app.schemas.courseRequest import CourseRequest
+from app.services.slide_templates import SLIDE_THEME
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+GENERATION_CACHE_DIR = os.getenv("GENERATION_CACHE_DIR", "cache/generations")
+# Model output is reused for identical requests for this long; a request
+# with regenerate=true always asks the model again.
+GENERATION_RESPONSE_TTL = float(os.getenv("GENERATION_RESPONSE_TTL", str(24 * 3600)))
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def request_key(request: CourseRequest) -> str:
+    """Canonical hash of what the model is asked: equal keys get the same course.
+
+    Case and whitespace are ignored; axis order is kept, since it shapes
+    the course outline. Rendering options are left out, so the same model
+    output serves every encoding profile and theme.
+    """
+    canonical = {
+        "language": _normalize(request.language),
+        "topic": _normalize(request.topic),
+        "level": _normalize(request.level),
+        "axes": [_normalize(axis) for axis in request.axes],
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def render_key(request: CourseRequest, response: dict, encoding_profile: str = None) -> str:
+    """Key of the video rendered from one model response to request.
+
+    An edited or regenerated course has a different response, so it never
+    reuses the render of an earlier one. The resolved encoding profile and
+    slide theme are included because the video depends on them.
+    """
+    canonical = json.dumps({
+        "request": request_key(request),
+        "response": response,
+        "profile": get_encoding_profile(encoding_profile or request.encoding_profile)["name"],
+        "theme": request.theme or SLIDE_THEME,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Index of finished generations.
+
+    Request keys map to the model response, which expires after
+    GENERATION_RESPONSE_TTL; render keys map to the ai_request_id whose
+    presentation holds the video. The artifacts themselves stay under
+    presentations/<ai_request_id>; an entry is only trusted while that
+    video still exists.
+    """
+
+    def __init__(self, directory: str = GENERATION_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def lookup(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        source = entry.get("ai_request_id")
+        if not source or not os.path.exists(f"presentations/{source}/{source}.mp4"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return entry
+
+    def response(self, key: str) -> dict | None:
+        """Model output recorded for key, unless it has expired."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry.get("response_at", 0) > GENERATION_RESPONSE_TTL:
+            return None
+        return entry.get("response")
+
+    def record(self, key: str, ai_request_id: UUID = None, response: dict = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = {}
+        if ai_request_id is not None:
+            entry["ai_request_id"] = str(ai_request_id)
+        if response is not None:
+            entry["response"] = response
+            entry["response_at"] = time.time()
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller runs the work; callers arriving while it is in flight
+    await the same result. Returns (result, leader).
+    """
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, work: Callable[[], Awaitable]):
+        flight = self._flights.get(key)
+        if flight is not None and flight.get_loop() is asyncio.get_running_loop():
+            logger.info(f"Joining in-flight generation {key[:12]}")
+            return await asyncio.shield(flight), False
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Mark the exception retrieved when nobody joined the flight.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result, True
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+
+generation_cache = GenerationCache()
+single_flight = SingleFlight()
@@ -0,0 +1,206 @@
+"""Shared outbound HTTP client for the model API and Spring Boot.
+
+One pooled ``httpx.AsyncClient`` per event loop keeps connections alive
+across calls. Idempotent requests are retried with exponential backoff on
+transport errors and transient statuses; POSTs only when the connection
+could not be established, since the server may already have acted on
+them (creating a duplicate course or model run). Files are uploaded as a streamed
+multipart body read off the event loop, so large videos are never loaded
+into memory or read with blocking I/O.
+"""
+import os
+import time
+import uuid
+import random
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Callable
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "300"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "60"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_MAX_ATTEMPTS = int(os.getenv("HTTP_MAX_ATTEMPTS", "4"))
+HTTP_RETRY_BASE_DELAY = float(os.getenv("HTTP_RETRY_BASE_DELAY", "0.5"))
+HTTP_RETRY_MAX_DELAY = float(os.getenv("HTTP_RETRY_MAX_DELAY", "10"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Raised before any byte of the request reached the server.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Pooled client bound to the running event loop.
+
+    Connections cannot be shared across loops, and video workers start a
+    fresh loop per job, hence one client per loop rather than a global.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        for stale in [other for other in _clients if other.is_closed()]:
+            del _clients[stale]
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    connect=HTTP_CONNECT_TIMEOUT, read=HTTP_READ_TIMEOUT,
+                    write=HTTP_WRITE_TIMEOUT, pool=HTTP_POOL_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+                ),
+            )
+            _clients[loop] = client
+        return client
+
+
+async def close_client():
+    """Close the client of the running loop (call on shutdown)."""
+    with _clients_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _retry_delay(attempt: int) -> float:
+    delay = min(HTTP_RETRY_MAX_DELAY, HTTP_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def request_with_retry(method: str, url: str, attempts: int = HTTP_MAX_ATTEMPTS,
+                             build: Callable[[], dict] = None, idempotent: bool = None,
+                             **kwargs) -> httpx.Response:
+    """Send a request, retrying failures that are safe to repeat.
+
+    Idempotent requests are retried on transport errors and transient
+    statuses. Others (by default POST and PATCH) only when the connection
+    failed; pass ``idempotent=True`` when the server deduplicates them.
+    ``build`` returns fresh keyword arguments for each attempt; use it when
+    the body is a one-shot stream that cannot be replayed.
+    """
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    client = get_client()
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await client.request(method, url, **(build() if build else {}), **kwargs)
+        except httpx.TransportError as e:
+            if attempt == attempts or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning(f"{method} {url} failed ({e!r}), retry {attempt}/{attempts - 1} in {delay:.1f}s")
+        else:
+            if not idempotent or response.status_code not in RETRY_STATUSES or attempt == attempts:
+                return response
+            delay = _retry_delay(attempt)
+            logger.warning(f"{method} {url} returned {response.status_code}, retry {attempt}/{attempts - 1} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+class TransferMetrics:
+    """Running totals of outbound uploads, for throughput monitoring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.failures = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.last_throughput = None
+
+    def record(self, size: int, seconds: float, ok: bool):
+        with self._lock:
+            if not ok:
+                self.failures += 1
+                return
+            self.uploads += 1
+            self.bytes += size
+            self.seconds += seconds
+            self.last_throughput = size / seconds if seconds else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "failures": self.failures,
+                "bytes": self.bytes,
+                "seconds": round(self.seconds, 3),
+                "average_bytes_per_second": round(self.bytes / self.seconds) if self.seconds else None,
+                "last_bytes_per_second": round(self.last_throughput) if self.last_throughput else None,
+            }
+
+
+transfer_metrics = TransferMetrics()
+
+
+async def iter_file(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a file in chunks without blocking the event loop."""
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+def _multipart(field: str, filename: str, path: str, content_type: str, data: dict) -> tuple[dict, Callable]:
+    boundary = uuid.uuid4().hex
+    head = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        for name, value in (data or {}).items()
+    ) + (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode('utf-8')
+    tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(len(head) + os.path.getsize(path) + len(tail)),
+    }
+
+    async def body():
+        yield head
+        async for chunk in iter_file(path):
+            yield chunk
+        yield tail
+
+    return headers, body
+
+
+async def upload_file(url: str, path: str, field: str = "file", filename: str = None,
+                      content_type: str = "application/octet-stream", data: dict = None,
+                      attempts: int = HTTP_MAX_ATTEMPTS) -> httpx.Response:
+    """POST a file as multipart/form-data, streamed from disk.
+
+    Retried only when the connection could not be established.
+    """
+    size = os.path.getsize(path)
+    headers, body = _multipart(field, filename or os.path.basename(path), path, content_type, data)
+    started = time.monotonic()
+    try:
+        response = await request_with_retry(
+            "POST", url, attempts, build=lambda: {"content": body()}, headers=headers
+        )
+    except Exception:
+        transfer_metrics.record(size, time.monotonic() - started, ok=False)
+        raise
+    elapsed = time.monotonic() - started
+    transfer_metrics.record(size, elapsed, ok=response.is_success)
+    if response.is_success:
+        logger.info(f"Uploaded {path} ({size} bytes) in {elapsed:.2f}s, {size / max(elapsed, 1e-6) / 1024 ** 2:.2f} MiB/s")
+    return response
@@ -0,0 +1,166 @@
+import os
+import json
+import asyncio
+import logging
+
+import websockets
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+MODEL_WS_URL = os.getenv("MODEL_WS_URL", "ws://localhost:8001/ws")
+MODEL_WS_POOL_SIZE = int(os.getenv("MODEL_WS_POOL_SIZE", "4"))
+MODEL_REQUEST_TIMEOUT = float(os.getenv("MODEL_REQUEST_TIMEOUT", "300"))
+# Set when the model service speaks the streaming protocol (see stream()).
+MODEL_STREAMING = os.getenv("MODEL_STREAMING", "false").lower() == "true"
+
+
+class ModelUnavailableError(Exception):
+    pass
+
+
+class ModelError(Exception):
+    """The model service reported a failure for one question."""
+
+
+def _is_open(connection) -> bool:
+    state = getattr(connection, "state", None)
+    return state is not None and state.name == "OPEN"
+
+
+class ModelConnectionPool:
+    """Fixed-size pool of WebSocket connections to the model service.
+
+    The model protocol has no request ids, so a connection carries one
+    question at a time; concurrency is bounded by the pool size. Callers
+    wait for a free connection in arrival order (asyncio.Queue wakes
+    getters FIFO), and each request is bounded by a timeout that covers
+    both the wait and the answer. The websockets keepalive pings keep
+    idle and busy connections alive.
+    """
+
+    def __init__(self, url: str = MODEL_WS_URL, size: int = MODEL_WS_POOL_SIZE, timeout: float = MODEL_REQUEST_TIMEOUT):
+        self.url = url
+        self.size = size
+        self.timeout = timeout
+        self._slots = None
+
+    def _queue(self) -> asyncio.Queue:
+        # Created on first use, inside the server's event loop. Slots start
+        # empty and connect lazily, so a down model service is not fatal.
+        if self._slots is None:
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(None)
+        return self._slots
+
+    async def _connect(self):
+        try:
+            connection = await websockets.connect(
+                self.url,
+                ping_interval=20,
+                ping_timeout=60,
+                close_timeout=10
+            )
+        except Exception as e:
+            raise ModelUnavailableError(f"Failed to connect to model service: {e}") from e
+        logger.info(f"Opened model connection to {self.url}")
+        return connection
+
+    async def _discard(self, connection):
+        if connection is not None:
+            try:
+                await connection.close()
+            except Exception:
+                pass
+
+    async def _exchange(self, question: str, exchange):
+        slots = self._queue()
+        connection = await slots.get()
+        try:
+            for attempt in (1, 2):
+                if connection is None or not _is_open(connection):
+                    await self._discard(connection)
+                    connection = None
+                    connection = await self._connect()
+                try:
+                    return await exchange(connection, question)
+                except websockets.ConnectionClosed as e:
+                    # A connection dropped while idle; retry once on a fresh one.
+                    logger.warning(f"Model connection closed ({e}), attempt {attempt}")
+                    await self._discard(connection)
+                    connection = None
+                    if attempt == 2:
+                        raise ModelUnavailableError(f"Model connection closed: {e}") from e
+        except BaseException:
+            # Timeouts and cancellations leave an answer in flight on this
+            # connection; it must not be handed to the next caller.
+            await self._discard(connection)
+            connection = None
+            raise
+        finally:
+            slots.put_nowait(connection)
+
+    async def request(self, question: str, exchange) -> str:
+        """Run exchange(connection, question) on a pooled connection."""
+        try:
+            return await asyncio.wait_for(self._exchange(question, exchange), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Model did not answer within {self.timeout:g}s")
+
+    async def ask(self, question: str) -> str:
+        async def exchange(connection, question):
+            await connection.send(question)
+            return await connection.recv()
+        return await self.request(question, exchange)
+
+    async def stream(self, question: str, on_delta) -> str:
+        """Ask a question and pass answer chunks to on_delta as they arrive.
+
+        Streaming protocol, one JSON object per WebSocket message:
+
+            -> {"type": "question", "question": "...", "stream": true}
+            <- {"type": "delta", "text": "..."}      (zero or more)
+            <- {"type": "done"}
+            <- {"type": "error", "message": "..."}   (instead of done)
+
+        A plain-text reply is taken as the whole answer, so models that do
+        not stream still work. Returns the full answer.
+        """
+        async def exchange(connection, question):
+            await connection.send(json.dumps({"type": "question", "question": question, "stream": True}))
+            parts = []
+            while True:
+                try:
+                    frame = await connection.recv()
+                except websockets.ConnectionClosed as e:
+                    if parts:
+                        # Chunks already reached the learner; a retry would repeat them.
+                        raise ModelUnavailableError(f"Model connection closed mid-answer: {e}") from e
+                    raise
+                try:
+                    message = json.loads(frame)
+                except (TypeError, ValueError):
+                    message = None
+                if not isinstance(message, dict) or "type" not in message:
+                    await on_delta(frame)
+                    return frame
+                if message["type"] == "delta":
+                    parts.append(message.get("text", ""))
+                    await on_delta(parts[-1])
+                elif message["type"] == "done":
+                    return "".join(parts)
+                elif message["type"] == "error":
+                    raise ModelError(message.get("message", "Model error"))
+        return await self.request(question, exchange)
+
+    async def close(self):
+        if self._slots is None:
+            return
+        while not self._slots.empty():
+            await self._discard(self._slots.get_nowait())
+        self._slots = None
+
+
+model_pool = ModelConnectionPool()
@@ -0,0 +1,87 @@
+import os
+import logging
+import threading
+from typing import Any, Callable, NamedTuple
+
+from cachetools import LRUCache
+from dotenv import load_dotenv
+
+from app.services.file_serving import make_etag
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+PRESENTATION_CACHE_MAX_BYTES = int(os.getenv("PRESENTATION_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))
+
+
+class CachedFile(NamedTuple):
+    value: Any
+    etag: str
+    mtime: float
+    mtime_ns: int
+    size: int
+
+
+class PresentationCache:
+    """In-memory LRU cache of presentation files, bounded by total file size.
+
+    Entries are keyed by (path, variant) and revalidated against the file's
+    mtime and size on every lookup, so a regenerated presentation is picked
+    up without explicit invalidation. ``variant`` lets callers cache
+    different derived values (parsed JSON, rewritten HTML) of one file.
+    """
+
+    def __init__(self, max_bytes: int = PRESENTATION_CACHE_MAX_BYTES):
+        self._entries = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: max(entry.size, 1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, parse: Callable[[bytes], Any] = None, variant: str = None) -> CachedFile:
+        """Return the cached value for path, reading and parsing it on a miss.
+
+        Raises FileNotFoundError when the file does not exist.
+        """
+        stat = os.stat(path)
+        key = (path, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry = CachedFile(
+            value=parse(data) if parse else data,
+            etag=make_etag(stat.st_mtime_ns, stat.st_size),
+            mtime=stat.st_mtime,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+        with self._lock:
+            try:
+                self._entries[key] = entry
+            except ValueError:
+                logger.info(f"{path} is larger than the presentation cache, not caching it")
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._entries.currsize,
+                "max_bytes": self._entries.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+presentation_cache = PresentationCache()
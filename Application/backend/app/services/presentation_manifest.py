@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import zipfile
+from typing import Callable, Iterator
+
+from cachetools import LRUCache
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+from app.services.content_service import probe_duration
+from app.services.slide_templates import STYLESHEET_NAME
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+MEDIA_INFO_CACHE_SIZE = int(os.getenv("MEDIA_INFO_CACHE_SIZE", "4096"))
+BUNDLE_CHUNK_SIZE = 256 * 1024
+BUNDLE_MANIFEST_NAME = "presentation.json"
+
+_SLIDE_RE = re.compile(r"^slide(\d+)\.html$")
+
+# (path, mtime_ns, size) -> {"sha256": ..., "duration": ...}. Keyed on the
+# file version, so regenerated media is hashed and probed again.
+_media_info = LRUCache(maxsize=MEDIA_INFO_CACHE_SIZE)
+_media_info_lock = threading.Lock()
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def media_info(path: str, probe: bool = False) -> dict | None:
+    """Size, mtime, sha256 and (for audio/video) duration of a file, cached by version."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _media_info_lock:
+        info = _media_info.get(key)
+    if info is None or (probe and "duration" not in info):
+        info = dict(info or {"sha256": _sha256(path)})
+        if probe:
+            try:
+                info["duration"] = round(probe_duration(path), 3)
+            except Exception as e:
+                logger.warning(f"Could not probe duration of {path}: {e}")
+                info["duration"] = None
+        with _media_info_lock:
+            _media_info[key] = info
+    return {"size": stat.st_size, "mtime": stat.st_mtime, **info}
+
+
+def slide_numbers(presentation_dir: str) -> list[int]:
+    try:
+        names = os.listdir(os.path.join(presentation_dir, "slides"))
+    except FileNotFoundError:
+        return []
+    return sorted(int(match.group(1)) for match in map(_SLIDE_RE.match, names) if match)
+
+
+def _slides_metadata(presentation_dir: str) -> dict:
+    try:
+        with open(os.path.join(presentation_dir, "slides.json"), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    # Written as {"slides": [...]}; a bare list is accepted too.
+    slides = data.get("slides", []) if isinstance(data, dict) else data
+    if not isinstance(slides, list):
+        return {}
+    return {str(slide.get("id")): slide for slide in slides if isinstance(slide, dict)}
+
+
+def _file_entry(presentation_dir: str, relative_path: str, url: str | None, probe: bool = False) -> dict | None:
+    info = media_info(os.path.join(presentation_dir, relative_path), probe)
+    if info is None:
+        return None
+    info.pop("mtime")
+    return {"path": relative_path, "url": url, **info}
+
+
+def build_manifest(presentation_dir: str, url_for: Callable[..., str] = None) -> dict:
+    """Describe every file of a presentation in one document.
+
+    ``url_for(route_name, **params)`` turns route names into absolute URLs;
+    without it (e.g. inside a bundle) only relative paths are listed.
+    """
+    url = url_for or (lambda *args, **kwargs: None)
+    metadata = _slides_metadata(presentation_dir)
+    numbers = slide_numbers(presentation_dir)
+    if not numbers:
+        raise FileNotFoundError(f"No slides found in {presentation_dir}")
+    session_id = os.path.basename(presentation_dir.rstrip("/"))
+
+    slides = []
+    for n in numbers:
+        slides.append({
+            "number": n,
+            "metadata": metadata.get(str(n)),
+            "html": _file_entry(presentation_dir, f"slides/slide{n}.html", url("get_slide_html", session_id=session_id, slide_number=n)),
+            "audio": _file_entry(presentation_dir, f"audios/audio{n}.mp3", url("get_audio", session_id=session_id, slide_number=n), probe=True),
+        })
+
+    manifest = {
+        "session_id": session_id,
+        "stylesheet": _file_entry(presentation_dir, STYLESHEET_NAME, url("get_presentation_stylesheet", session_id=session_id)),
+        "slides": slides,
+        "video": _file_entry(presentation_dir, f"{session_id}.mp4", url("get_course_video", ai_request_id=session_id), probe=True),
+    }
+    if os.path.exists(os.path.join(presentation_dir, "hls", "current")):
+        manifest["hls"] = url("get_hls_master", ai_request_id=session_id)
+    durations = [slide["audio"]["duration"] for slide in slides if slide["audio"] and slide["audio"]["duration"]]
+    manifest["duration"] = round(sum(durations), 3)
+    if metadata and not any(slide["metadata"] for slide in slides):
+        logger.warning(f"slides.json of {presentation_dir} matches none of its slides")
+    return manifest
+
+
+async def build_manifest_async(presentation_dir: str, url_for: Callable[..., str] = None) -> dict:
+    # Hashing and ffprobe run off the event loop; repeat calls hit the cache.
+    return await run_in_threadpool(build_manifest, presentation_dir, url_for)
+
+
+class _ZipOutput:
+    """Write-only, non-seekable sink that hands written bytes to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def bundle_files(presentation_dir: str, include_video: bool = False) -> list[str]:
+    """Relative paths packed into a bundle, in playback order."""
+    session_id = os.path.basename(presentation_dir.rstrip("/"))
+    paths = ["slides.json", STYLESHEET_NAME]
+    for n in slide_numbers(presentation_dir):
+        paths += [f"slides/slide{n}.html", f"audios/audio{n}.mp3"]
+    if include_video:
+        paths.append(f"{session_id}.mp4")
+    return [path for path in paths if os.path.isfile(os.path.join(presentation_dir, path))]
+
+
+def iter_bundle(presentation_dir: str, include_video: bool = False) -> Iterator[bytes]:
+    """Stream an uncompressed zip of the presentation for offline playback.
+
+    Media is already compressed, so entries are stored rather than
+    deflated, and the archive is produced chunk by chunk without ever
+    being held in memory or written to disk. Slides keep their relative
+    stylesheet link, so the unpacked bundle renders as-is.
+    """
+    manifest = build_manifest(presentation_dir)
+    if not include_video:
+        manifest["video"] = None
+    output = _ZipOutput()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED, allowZip64=True) as bundle:
+        bundle.writestr(BUNDLE_MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False))
+        for relative_path in bundle_files(presentation_dir, include_video):
+            path = os.path.join(presentation_dir, relative_path)
+            info = zipfile.ZipInfo.from_file(path, relative_path)
+            info.compress_type = zipfile.ZIP_STORED
+            with open(path, 'rb') as source, bundle.open(info, 'w') as target:
+                for chunk in iter(lambda: source.read(BUNDLE_CHUNK_SIZE), b''):
+                    target.write(chunk)
+                    yield output.drain()
+    # Whatever is left: the last data descriptor and the central directory.
+    yield output.drain()
@@ -1,15 +1,15 @@
 import json
-import subprocess
-import tempfile
 import google.generativeai as genai
-import os
 import base64
-import whisperx
 import logging
 import asyncio
 
+import numpy as np
 from dotenv import load_dotenv
 from app.models.course import Course
+from app.services.model_pool import model_pool, ModelUnavailableError, MODEL_STREAMING
+from app.services.answer_cache import answer_cache
+from app.services.transcription_pool import transcription_pool
 from fastapi import WebSocket
 
 load_dotenv()
@@ -30,67 +30,57 @@ class ConnectionManager:
         self.active_connections.remove(websocket)
 
     async def send_response(self, websocket, data: dict):
-        logger.info(f"Sending response to {websocket.client}: {data}")
+        if data.get("type") == "text_delta":
+            logger.debug(f"Sending response to {websocket.client}: {data}")
+        else:
+            logger.info(f"Sending response to {websocket.client}: {data}")
         await websocket.send_text(json.dumps(data))
 
 
 class SpeechToTextService:
-    def __init__(self, model_size="small"):
-        self.model = whisperx.load_model(model_size, device="cpu", compute_type="float32")
-        logging.info(f"WhisperX model '{model_size}' loaded successfully")
+    def __init__(self, pool=transcription_pool):
+        # The model lives in the pool's worker processes, loaded on first use.
+        self.pool = pool
 
     async def transcribe_audio(self, audio_data: bytes) -> str:
+        process = None
         try:
-            # Save incoming audio as WebM
-            with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as temp_input:
-                temp_input.write(audio_data)
-                temp_input_path = temp_input.name
-
-            # Convert WebM to WAV using FFmpeg
-            temp_output_path = temp_input_path.replace(".webm", ".wav")
-            ffmpeg_command = [
+            # Decode the WebM from stdin to 16 kHz mono PCM on stdout
+            process = await asyncio.create_subprocess_exec(
                 "ffmpeg",
-                "-i", temp_input_path,
-                "-ar", "16000",
+                "-hide_banner",
+                "-loglevel", "error",
+                "-i", "pipe:0",
+                "-f", "s16le",
                 "-ac", "1",
-                "-y",
-                temp_output_path
-            ]
-            process = subprocess.run(
-                ffmpeg_command,
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            logging.info(f"FFmpeg conversion output: {process.stdout}")
-
-            # Transcribe the WAV file
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.model.transcribe(temp_output_path, language="en")
+                "-ar", "16000",
+                "pipe:1",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
+            pcm, stderr = await process.communicate(input=audio_data)
+            if process.returncode != 0:
+                logging.error(f"FFmpeg conversion error: {stderr.decode(errors='replace')}")
+                return None
+            audio = np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
 
-            # Clean up temporary files
-            os.remove(temp_input_path)
-            os.remove(temp_output_path)
-
-            # Log the full result for debugging
-            logging.info(f"WhisperX result: {result}")
+            # Transcribe the samples on a warm worker
+            transcribed_text = await self.pool.transcribe(audio)
 
-            # Check if 'segments' exists (WhisperX typically returns 'segments' and 'language')
-            if "segments" in result and result["segments"]:
-                # Combine text from all segments
-                transcribed_text = " ".join(segment["text"] for segment in result["segments"]).strip()
-                return transcribed_text if transcribed_text else None
-            else:
+            logging.info(f"WhisperX result: {transcribed_text}")
+            if not transcribed_text:
                 logging.error("No segments found in transcription result")
-                return None
+            return transcribed_text
 
-        except subprocess.CalledProcessError as e:
-            logging.error(f"FFmpeg conversion error: {e.stderr}")
-            return None
         except Exception as e:
             logging.error(f"WhisperX transcription error: {str(e)}")
             return None
+        finally:
+            # Errors and cancellation must not leave ffmpeg running
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
 
 
 class QAService:
@@ -98,68 +88,53 @@ class QAService:
         self.manager = ConnectionManager()
         self.speech_service = SpeechToTextService()
         self.authenticated = {}  # Store authenticated WebSocket connections
-        self.model_ws = None
-
-    async def connect_to_model(self):
-        import websockets
-        try:
-            # Configure WebSocket with longer ping interval and timeout
-            self.model_ws = await websockets.connect(
-                "ws://localhost:8001/ws",
-                ping_interval=50,  # Increase ping interval (seconds)
-                ping_timeout=300,  # Increase timeout to 5 minutes
-                close_timeout=10   # Close timeout
-            )
-            logger.info("Successfully connected to model WebSocket")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to connect to model WebSocket: {e}")
-            return False
+        self.model_pool = model_pool
+        self.answer_cache = answer_cache
 
-    async def ask_model(self, question: str) -> str:
+    async def ask_model(self, question: str, course_id: str = None) -> str:
         """Send a question to the model and get the response"""
-        if not self.model_ws:
-            if not await self.connect_to_model():
-                return "Failed to connect to model service"
-
+        cached = self.answer_cache.get(course_id, question)
+        if cached is not None:
+            return cached
         try:
-            # Start a background task to keep the connection alive
-            heartbeat_task = asyncio.create_task(self._heartbeat())
-
-            await self.model_ws.send(question)
-            response = await self.model_ws.recv()
-
-            # Cancel the heartbeat task once we get a response
-            heartbeat_task.cancel()
-            return response
+            answer = await self.model_pool.ask(question)
+            self.answer_cache.put(course_id, question, answer)
+            return answer
+        except ModelUnavailableError as e:
+            logger.error(f"Model service unavailable: {e}")
+            return "Failed to connect to model service"
         except Exception as e:
             logger.error(f"Error communicating with model: {e}")
-            # Try to reconnect once
-            if await self.connect_to_model():
-                try:
-                    await self.model_ws.send(question)
-                    response = await self.model_ws.recv()
-                    return response
-                except Exception as e2:
-                    logger.error(f"Error after reconnection: {e2}")
             return f"Error communicating with model: {str(e)}"
 
-    async def _heartbeat(self):
-        """Send periodic pings to keep the connection alive during long model inferences"""
+    async def stream_answer(self, websocket, question: str, course_id: str = None) -> str:
+        """Forward the model's answer as text_delta frames, then text_done."""
+        async def forward(chunk: str):
+            if chunk:
+                await self.manager.send_response(websocket, {"type": "text_delta", "text": chunk})
+
         try:
-            while True:
-                if self.model_ws and self.model_ws.open:
-                    logger.debug("Sending heartbeat ping to model service")
-                    pong_waiter = await self.model_ws.ping()
-                    await asyncio.wait_for(pong_waiter, timeout=10)
-                await asyncio.sleep(30)  # Send ping every 30 seconds
-        except asyncio.CancelledError:
-            # Task was cancelled, which is expected when we're done
-            pass
+            cached = self.answer_cache.get(course_id, question)
+            if cached is not None:
+                answer = cached
+                await forward(answer)
+            elif MODEL_STREAMING:
+                answer = await self.model_pool.stream(question, forward)
+                self.answer_cache.put(course_id, question, answer)
+            else:
+                answer = await self.ask_model(question, course_id)
+                await forward(answer)
         except Exception as e:
-            logger.warning(f"Heartbeat error: {e}")
+            logger.error(f"Error streaming answer from model: {e}")
+            await self.manager.send_response(websocket, {
+                "type": "error",
+                "message": f"Error communicating with model: {str(e)}"
+            })
+            return None
+        await self.manager.send_response(websocket, {"type": "text_done", "text": answer})
+        return answer
 
-    async def process_question(self, websocket, question_text: str):
+    async def process_question(self, websocket, question_text: str, course_id: str = None, stream: bool = False):
         try:
             if not question_text or not question_text.strip():
                 await self.manager.send_response(websocket, {
@@ -168,7 +143,11 @@ class QAService:
                 })
                 return
 
-            text_response = await self.ask_model(f"{question_text}")
+            if stream:
+                await self.stream_answer(websocket, question_text, course_id)
+                return
+
+            text_response = await self.ask_model(f"{question_text}", course_id)
 
             await self.manager.send_response(websocket, {
                 "type": "text_response",
@@ -182,7 +161,7 @@ class QAService:
                 "message": f"Error processing question: {str(e)}"
             })
 
-    async def handle_voice_question(self, websocket, audio_data_b64: str):
+    async def handle_voice_question(self, websocket, audio_data_b64: str, course_id: str = None, stream: bool = False):
         try:
             logger.info(f"Handling voice question with audio data length: {len(audio_data_b64)}")
             audio_data = base64.b64decode(audio_data_b64)
@@ -203,7 +182,7 @@ class QAService:
                 "transcribed_text": transcribed_text,
                 "status": "processing_response"
             })
-            await self.process_question(websocket, transcribed_text)
+            await self.process_question(websocket, transcribed_text, course_id, stream)
         except Exception as e:
             logger.error(f"Voice processing error: {e}")
             await self.manager.send_response(websocket, {
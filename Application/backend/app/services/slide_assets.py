@@ -0,0 +1,54 @@
+import os
+import re
+import html
+
+from dotenv import load_dotenv
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+load_dotenv()
+
+SLIDE_CODE_STYLE = os.getenv("SLIDE_CODE_STYLE", "monokai")
+DEFAULT_CODE_LANGUAGE = "java"
+
+_CODE_RE = re.compile(r"<code([^>]*)>(.*?)</code>", re.DOTALL | re.IGNORECASE)
+_PRE_RE = re.compile(r"<pre[^>]*>(.*?)</pre>", re.DOTALL | re.IGNORECASE)
+_LANGUAGE_RE = re.compile(r"language-([\w+#-]+)")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+_formatter = HtmlFormatter(style=SLIDE_CODE_STYLE, nowrap=True)
+
+# Token colours for highlighted code, computed once and inlined into slides
+# so rendering never depends on a CDN.
+CODE_CSS = _formatter.get_style_defs(".code-content pre")
+
+
+def _code_block(body: str, attrs: str = "") -> tuple[str, str]:
+    language = DEFAULT_CODE_LANGUAGE
+    language_match = _LANGUAGE_RE.search(attrs)
+    if language_match:
+        language = language_match.group(1).lower()
+    return html.unescape(_TAG_RE.sub("", body)).strip("\n"), language
+
+
+def extract_code(example_code: str) -> list[tuple[str, str]]:
+    """Return (source, language) for every ``<code>`` (or ``<pre>``) block of the model's snippet."""
+    blocks = [_code_block(body, attrs) for attrs, body in _CODE_RE.findall(example_code)]
+    if not blocks:
+        blocks = [_code_block(body) for body in _PRE_RE.findall(example_code)]
+    return blocks or [_code_block(example_code)]
+
+
+def highlight_example_code(example_code: str) -> str:
+    """Syntax-highlight a code snippet into static HTML at generation time."""
+    blocks = []
+    for source, language in extract_code(example_code):
+        try:
+            lexer = get_lexer_by_name(language)
+        except ClassNotFound:
+            lexer = get_lexer_by_name("text")
+        body = highlight(source, lexer, _formatter)
+        blocks.append(f'<pre><code class="language-{html.escape(language)}">{body}</code></pre>')
+    return "\n".join(blocks)
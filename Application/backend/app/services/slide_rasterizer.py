@@ -0,0 +1,305 @@
+"""Browser-free rasterizer for slides produced by ``generate_html_slide``.
+
+It understands only that template: the slide number, the summary block and
+the code block are read back from the HTML and laid out directly with
+Pillow, with syntax highlighting from Pygments. Colours come from the theme
+variables of the stylesheet the slide links to, so themed presentations
+render as they do in a browser. No browser process is started and nothing
+is fetched from the network.
+"""
+import os
+import re
+import logging
+from html.parser import HTMLParser
+
+from dotenv import load_dotenv
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+from pygments import lex
+from pygments.lexers import get_lexer_by_name
+from pygments.styles import get_style_by_name
+from pygments.util import ClassNotFound
+
+from app.services.slide_assets import SLIDE_CODE_STYLE
+from app.services.slide_templates import get_stylesheet
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SLIDE_FONT_PATH = os.getenv("SLIDE_FONT_PATH", "DejaVuSans.ttf")
+SLIDE_BOLD_FONT_PATH = os.getenv("SLIDE_BOLD_FONT_PATH", "DejaVuSans-Bold.ttf")
+SLIDE_MONO_FONT_PATH = os.getenv("SLIDE_MONO_FONT_PATH", "DejaVuSansMono.ttf")
+
+WIDTH, HEIGHT = 1920, 1080
+CONTAINER_WIDTH = 1200
+VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+_THEME_VAR_RE = re.compile(r"--([\w-]+)\s*:\s*([^;]+);")
+_HEX_COLOR_RE = re.compile(r"#[0-9a-fA-F]{3,8}\b")
+
+
+class SlideParser(HTMLParser):
+    """Extracts slide number, summary bullets and code from the slide template."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.slide_number = ""
+        self.summary = []       # paragraphs, each a list of (text, bold) runs
+        self.code_blocks = []   # [source, language] per <pre> block
+        self.stylesheet = None
+        self._section = None
+        self._depth = 0
+        self._bold = 0
+        self._in_heading = False
+        self._in_pre = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag == "link" and "stylesheet" in (attrs.get("rel") or "").split():
+            self.stylesheet = attrs.get("href")
+        if self._section:
+            if tag not in VOID_TAGS:
+                self._depth += 1
+        elif tag == "div" and {"slide-number", "summary", "code-content"} & set(classes):
+            self._section = next(c for c in classes if c in {"slide-number", "summary", "code-content"})
+            self._depth = 1
+            if self._section == "summary":
+                self.summary.append([])
+            return
+
+        if self._section == "summary":
+            if tag == "h2":
+                self._in_heading = True
+            elif tag in ("li", "p", "br"):
+                self.summary.append([])
+            elif tag in ("strong", "b"):
+                self._bold += 1
+        elif self._section == "code-content" and tag == "pre":
+            self._in_pre = True
+            self.code_blocks.append(["", "java"])
+        elif self._section == "code-content" and tag == "code":
+            for cls in classes:
+                if cls.startswith("language-"):
+                    if self.code_blocks:
+                        self.code_blocks[-1][1] = cls[len("language-"):]
+
+    def handle_startendtag(self, tag, attrs):
+        if self._section == "summary" and tag == "br":
+            self.summary.append([])
+
+    def handle_endtag(self, tag):
+        if not self._section or tag in VOID_TAGS:
+            return
+        if self._section == "summary":
+            if tag == "h2":
+                self._in_heading = False
+            elif tag in ("strong", "b"):
+                self._bold = max(0, self._bold - 1)
+        elif tag == "pre":
+            self._in_pre = False
+        self._depth -= 1
+        if self._depth == 0:
+            self._section = None
+
+    def handle_data(self, data):
+        if self._section == "slide-number":
+            self.slide_number += data.strip()
+        elif self._section == "summary" and not self._in_heading:
+            text = re.sub(r"\s+", " ", data)
+            if text:
+                self.summary[-1].append((text, self._bold > 0))
+        elif self._section == "code-content" and self._in_pre:
+            self.code_blocks[-1][0] += data
+
+
+def theme_colors(css: str) -> dict:
+    """Theme variables from a slide stylesheet.
+
+    Gradients become (first stop, last stop) and are drawn at the 135deg
+    every theme uses.
+    """
+    colors = {}
+    for name, value in _THEME_VAR_RE.findall(css):
+        value = value.strip()
+        if "gradient(" in value:
+            stops = _HEX_COLOR_RE.findall(value)
+            if stops:
+                colors[name] = (stops[0], stops[-1])
+        else:
+            colors[name] = value
+    return colors
+
+
+def _slide_theme(html_path: str, href: str | None) -> dict:
+    css = None
+    if href:
+        try:
+            with open(os.path.join(os.path.dirname(html_path), href), "r", encoding="utf-8") as f:
+                css = f.read()
+        except OSError as e:
+            logger.warning(f"Could not read stylesheet {href} of {html_path}, using the default theme: {e}")
+    return theme_colors(css or get_stylesheet())
+
+
+def _font(path: str, size: int):
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def _gradient(size, start: str, end: str) -> Image.Image:
+    """135deg linear gradient, as in the template's CSS."""
+    width, height = size
+    horizontal = Image.linear_gradient("L").rotate(90).resize((width, height))
+    vertical = Image.linear_gradient("L").resize((width, height))
+    mask = ImageChops.add(horizontal, vertical, scale=2.0)
+    return Image.composite(Image.new("RGB", size, end), Image.new("RGB", size, start), mask)
+
+
+def _fill(size, value) -> Image.Image:
+    if isinstance(value, tuple):
+        return _gradient(size, *value)
+    return Image.new("RGB", size, value)
+
+
+def _translucent_pill(image: Image.Image, box, radius: int, alpha: float = 0.2):
+    """rgba(255, 255, 255, alpha) pill over what is already drawn."""
+    box = tuple(int(v) for v in box)
+    region = image.crop(box)
+    tinted = Image.blend(region, Image.new("RGB", region.size, "white"), alpha)
+    _paste_rounded(image, tinted, box[:2], radius)
+
+
+def _paste_rounded(canvas: Image.Image, tile: Image.Image, xy, radius: int):
+    mask = Image.new("L", tile.size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, tile.size[0] - 1, tile.size[1] - 1), radius, fill=255)
+    canvas.paste(tile, xy, mask)
+
+
+def _wrap_runs(draw, runs, fonts, max_width):
+    """Word-wrap (text, bold) runs into lines of (x_offset, word, bold)."""
+    lines, line, x = [], [], 0
+    space = draw.textlength(" ", font=fonts[False])
+    glued = False  # no whitespace since the previous word, e.g. "<b>Foo</b>:"
+    for text, bold in runs:
+        for token in re.findall(r"\s+|\S+", text):
+            if token.isspace():
+                glued = False
+                continue
+            width = draw.textlength(token, font=fonts[bold])
+            if line and not glued:
+                x += space
+                if x + width > max_width:
+                    lines.append(line)
+                    line, x = [], 0
+            line.append((x, token, bold))
+            x += width
+            glued = True
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _code_colors(code: str, language: str, default_color: str):
+    try:
+        lexer = get_lexer_by_name(language)
+    except ClassNotFound:
+        lexer = get_lexer_by_name("text")
+    style = get_style_by_name(SLIDE_CODE_STYLE)
+    lines = [[]]
+    for token_type, value in lex(code, lexer):
+        color = style.style_for_token(token_type)["color"]
+        color = f"#{color}" if color else default_color
+        parts = value.split("\n")
+        for n, part in enumerate(parts):
+            if n:
+                lines.append([])
+            if part:
+                lines[-1].append((part, color))
+    # The lexer ends the source with a newline of its own.
+    if len(lines) > 1 and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def render_slide_png(html_path: str, output_png: str):
+    with open(html_path, "r", encoding="utf-8") as f:
+        parser = SlideParser()
+        parser.feed(f.read())
+
+    text_font = _font(SLIDE_FONT_PATH, 16)
+    bold_font = _font(SLIDE_BOLD_FONT_PATH, 16)
+    heading_font = _font(SLIDE_BOLD_FONT_PATH, 22)
+    small_font = _font(SLIDE_BOLD_FONT_PATH, 14)
+    mono_font = _font(SLIDE_MONO_FONT_PATH, 14)
+    fonts = {False: text_font, True: bold_font}
+    theme = _slide_theme(html_path, parser.stylesheet)
+
+    image = _fill((WIDTH, HEIGHT), theme["page-background"])
+    scratch = ImageDraw.Draw(image)
+
+    left = (WIDTH - CONTAINER_WIDTH) // 2
+    inner_width = CONTAINER_WIDTH - 80
+
+    # Measure the summary and code blocks so the container can be sized.
+    bullets = [runs for runs in parser.summary if any(text.strip() for text, _ in runs)]
+    bullet_lines = [_wrap_runs(scratch, runs, fonts, inner_width - 50 - 25) for runs in bullets]
+    line_height = 26
+    summary_height = 25 + 35 + sum(len(lines) * line_height + 24 + 15 for lines in bullet_lines) + 25
+    # Several snippets are stacked in one code panel, a blank line apart.
+    code_lines = []
+    for source, language in parser.code_blocks or [["", "java"]]:
+        if code_lines:
+            code_lines.append([])
+        code_lines += _code_colors(source.strip("\n").expandtabs(4), language, theme["code-color"])
+    code_height = 50 + 50 + len(code_lines) * 21
+    header_height = 60
+    container_height = header_height + 40 + summary_height + 30 + code_height + 40
+
+    container = _fill((CONTAINER_WIDTH, container_height), theme["card-background"])
+    draw = ImageDraw.Draw(container)
+    container.paste(_fill((CONTAINER_WIDTH, header_height), theme["header-background"]), (0, 0))
+    label = parser.slide_number
+    label_width = draw.textlength(label, font=small_font)
+    _translucent_pill(container, (CONTAINER_WIDTH - 30 - label_width - 30, 14, CONTAINER_WIDTH - 30, 46), 16)
+    draw.text((CONTAINER_WIDTH - 45 - label_width, 21), label, font=small_font, fill="white")
+
+    # Summary block.
+    x0, y = 40, header_height + 40
+    _paste_rounded(container, _fill((inner_width, summary_height), theme["summary-background"]), (x0, y), 10)
+    draw.rectangle((x0, y, x0 + 5, y + summary_height), fill=theme["accent-color"])
+    draw.text((x0 + 30, y + 25), "Résumé", font=heading_font, fill=theme["heading-color"])
+    y += 25 + 35
+    for n, lines in enumerate(bullet_lines):
+        y += 15 + 12
+        draw.text((x0 + 30, y + 4), "▶", font=_font(SLIDE_FONT_PATH, 12), fill=theme["accent-color"])
+        for line in lines:
+            for offset, word, bold in line:
+                draw.text((x0 + 55 + offset, y), word, font=fonts[bold], fill=theme["heading-color"] if bold else theme["text-color"])
+            y += line_height
+        y += 12
+        if n < len(bullet_lines) - 1:
+            draw.line((x0 + 30, y, x0 + inner_width - 25, y), fill=theme["divider-color"])
+
+    # Code block.
+    y = header_height + 40 + summary_height + 30
+    code_tile = _fill((inner_width, code_height), theme["code-background"])
+    code_draw = ImageDraw.Draw(code_tile)
+    code_tile.paste(_fill((inner_width, 50), theme["code-header-background"]), (0, 0))
+    code_draw.text((25, 16), "Code Java", font=_font(SLIDE_BOLD_FONT_PATH, 16), fill="white")
+    lang = (parser.code_blocks[0][1] if parser.code_blocks else "java").capitalize()
+    lang_width = code_draw.textlength(lang, font=small_font)
+    _translucent_pill(code_tile, (inner_width - 25 - lang_width - 24, 12, inner_width - 25, 38), 13)
+    code_draw.text((inner_width - 37 - lang_width, 17), lang, font=small_font, fill="white")
+    line_y = 50 + 25
+    for tokens in code_lines:
+        x = 25
+        for text, color in tokens:
+            code_draw.text((x, line_y), text, font=mono_font, fill=color)
+            x += code_draw.textlength(text, font=mono_font)
+        line_y += 21
+    _paste_rounded(container, code_tile, (40, y), 10)
+
+    _paste_rounded(image, container, (left, 20), 15)
+    image.save(output_png, optimize=False)
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+from string import Template
+
+from dotenv import load_dotenv
+
+from app.services.slide_assets import CODE_CSS, highlight_example_code
+
+load_dotenv()
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "slides"
+SLIDE_THEME = os.getenv("SLIDE_THEME", "default")
+
+# Written once per presentation, next to the slides/ directory, so slide
+# files link to it as ../styles.css both on disk and when served by the API.
+STYLESHEET_NAME = "styles.css"
+STYLESHEET_HREF = f"../{STYLESHEET_NAME}"
+
+# Templates and stylesheets are read and compiled once, at import time.
+_slide_template = Template((TEMPLATE_DIR / "slide.html").read_text(encoding="utf-8"))
+_base_css = (TEMPLATE_DIR / "slide.css").read_text(encoding="utf-8")
+THEMES = {
+    path.stem: path.read_text(encoding="utf-8")
+    for path in sorted((TEMPLATE_DIR / "themes").glob("*.css"))
+}
+_stylesheets = {
+    name: "\n".join((theme_css, _base_css, CODE_CSS))
+    for name, theme_css in THEMES.items()
+}
+
+
+def validate_theme(theme: str | None) -> str | None:
+    """Return theme unchanged, or raise ValueError if it is not a known theme."""
+    if theme is not None and theme not in THEMES:
+        raise ValueError(f"Slide theme must be one of: {', '.join(THEMES)}")
+    return theme
+
+
+def get_stylesheet(theme: str = None) -> str:
+    return _stylesheets[validate_theme(theme or SLIDE_THEME)]
+
+
+def write_stylesheet(presentation_dir, theme: str = None) -> Path:
+    path = Path(presentation_dir) / STYLESHEET_NAME
+    # Replaced, not rewritten: the old file may be linked into a cloned presentation.
+    tmp_path = path.with_name(f"{STYLESHEET_NAME}.tmp")
+    tmp_path.write_text(get_stylesheet(theme), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def render_slide(slide_data: dict) -> str:
+    return _slide_template.substitute(
+        title=slide_data.get('title', f"Slide {slide_data['id']}"),
+        stylesheet=STYLESHEET_HREF,
+        slide_id=slide_data['id'],
+        summary=slide_data.get('summary', 'Résumé indisponible'),
+        code=highlight_example_code(slide_data.get('example_code', '<pre><code>// Code indisponible</code></pre>')),
+    )
@@ -0,0 +1,134 @@
+"""WhisperX transcription in a pool of warm worker processes.
+
+Each worker loads the model once, in its initializer, and keeps it for
+its lifetime. Every voice question is its own task, so up to
+WHISPER_WORKERS clips are transcribed at once and each resolves as soon as
+it is done; within a clip, WhisperX batches the speech segments
+(``transcribe(batch_size=)``). The pool starts on first use, or at startup
+with WHISPER_PRELOAD=true.
+
+This module is imported by the spawned workers, so it must stay free of
+heavy imports at module level.
+"""
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "small")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+# int8 quantization is several times faster than float32 on CPU.
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "en")
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "2"))
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", str(max(1, (os.cpu_count() or 1) // max(1, WHISPER_WORKERS)))))
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+# Upper bound on one transcription, queueing included.
+WHISPER_TIMEOUT = float(os.getenv("WHISPER_TIMEOUT", "120"))
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() == "true"
+
+_model = None  # the worker process's model
+
+
+def _load_model(model_size: str, device: str, compute_type: str, threads: int):
+    global _model
+    import whisperx
+    _model = whisperx.load_model(model_size, device=device, compute_type=compute_type, threads=threads)
+    logging.info(f"WhisperX model '{model_size}' ({compute_type}) loaded in worker {os.getpid()}")
+
+
+def _transcribe_clip(clip, language: str, batch_size: int) -> str | None:
+    """Runs in a worker: transcribe a clip (a path or 16 kHz float32 array)."""
+    result = _model.transcribe(clip, batch_size=batch_size, language=language)
+    segments = result.get("segments") or []
+    text = " ".join(segment["text"] for segment in segments).strip()
+    return text or None
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class TranscriptionPool:
+    def __init__(self, workers: int = WHISPER_WORKERS, timeout: float = WHISPER_TIMEOUT):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                logger.info(f"Starting {self.workers} WhisperX workers ({WHISPER_MODEL_SIZE}, {WHISPER_COMPUTE_TYPE})")
+                # spawn, not fork: the API process runs threads and the
+                # inference libraries are not fork-safe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_model,
+                    initargs=(WHISPER_MODEL_SIZE, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE, WHISPER_THREADS),
+                )
+            return self._executor
+
+    def _reset(self, executor, terminate: bool = False):
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        # Taken before shutdown(), which drops the executor's process table.
+        processes = list((executor._processes or {}).values()) if terminate else []
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    async def transcribe(self, clip) -> str | None:
+        """Transcribe one clip on a free worker."""
+        executor = self._pool()
+        job = executor.submit(_transcribe_clip, clip, WHISPER_LANGUAGE, WHISPER_BATCH_SIZE)
+        result = asyncio.wrap_future(job)
+        try:
+            # Shielded so that only job.cancel() below cancels the work, and
+            # a cancellation by close() can be told apart from the caller's.
+            return await asyncio.wait_for(asyncio.shield(result), self.timeout)
+        except asyncio.TimeoutError:
+            if not job.cancel():
+                # Already running: a worker cannot be interrupted, only
+                # killed. Clips in flight on the other workers fail with
+                # BrokenProcessPool; the next call starts a fresh pool.
+                logger.error(f"Transcription exceeded {self.timeout:g}s; restarting the WhisperX workers")
+                self._reset(executor, terminate=True)
+                # The job now fails with BrokenProcessPool, which nobody awaits.
+                result.add_done_callback(lambda future: future.cancelled() or future.exception())
+            raise TimeoutError(f"Transcription did not finish within {self.timeout:g}s")
+        except asyncio.CancelledError:
+            if result.cancelled():
+                raise RuntimeError("The transcription pool was shut down") from None
+            job.cancel()
+            raise
+        except BrokenProcessPool:
+            logger.error("A WhisperX worker died; the pool will restart on next use")
+            self._reset(executor)
+            raise
+
+    async def warm(self):
+        """Start every worker and wait until each has loaded the model."""
+        loop = asyncio.get_running_loop()
+        executor = self._pool()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _ready) for _ in range(self.workers)))
+        logger.info(f"WhisperX workers ready: {sorted(set(pids))}")
+
+    def close(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+transcription_pool = TranscriptionPool()
@@ -0,0 +1,331 @@
+import os
+import uuid
+import logging
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.configs.db import SessionLocal
+from app.models.video_job import VideoJob, VideoJobStatus
+from app.schemas.courseRequest import CourseRequest
+from app.schemas.video_job import VideoJobResponse, BatchRequest, BatchResponse
+from app.services.content_service import (
+    check_and_generate_video, request_course_content, produce_course_video, publish_alias
+)
+from app.services.generation_cache import render_key
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+VIDEO_JOB_MAX_ATTEMPTS = int(os.getenv("VIDEO_JOB_MAX_ATTEMPTS", "3"))
+VIDEO_JOB_STALE_SECONDS = int(os.getenv("VIDEO_JOB_STALE_SECONDS", "120"))
+# Caps on RUNNING jobs across all workers, overall and per batch; 0 disables.
+VIDEO_MAX_RUNNING_JOBS = int(os.getenv("VIDEO_MAX_RUNNING_JOBS", "0"))
+VIDEO_BATCH_MAX_RUNNING_JOBS = int(os.getenv("VIDEO_BATCH_MAX_RUNNING_JOBS", "0"))
+# Arbitrary key for the advisory lock that serializes capped claims.
+CLAIM_LOCK_KEY = 0x766A6F62
+
+# Share of overall progress covered by each pipeline stage, in order.
+STAGE_WEIGHTS = [("model", 0.1), ("slides", 0.05), ("audio", 0.2), ("video", 0.55), ("upload", 0.1)]
+
+
+def overall_progress(stage: str, fraction: float) -> float:
+    done = 0.0
+    for name, weight in STAGE_WEIGHTS:
+        if name == stage:
+            return round(done + weight * min(max(fraction, 0.0), 1.0), 4)
+        done += weight
+    return done
+
+
+def job_hash(request: CourseRequest, encoding_profile: str = None, response: dict = None) -> str:
+    """Identity of a job's video: its request and rendering options, plus the model response when known."""
+    return render_key(request, response, encoding_profile)
+
+
+def submit_job(db: Session, ai_request_id: UUID, language: str, response: dict, spring_boot_host: str = "localhost", encoding_profile: str = None, request: CourseRequest = None) -> VideoJobResponse:
+    """Queue a video job, or join an identical one that is still in flight.
+
+    With a course request, a QUEUED or RUNNING job for the same request and
+    model response takes ai_request_id as an alias instead of rendering the
+    course twice. Requests with regenerate always get their own job.
+    """
+    request_hash = job_hash(request, encoding_profile, response) if request is not None else None
+    if request_hash and not request.regenerate:
+        # Serializes submissions of the same course across API processes.
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": int(request_hash[:15], 16)})
+        existing = (
+            db.query(VideoJob)
+            .filter(
+                VideoJob.request_hash == request_hash,
+                VideoJob.status.in_([VideoJobStatus.QUEUED, VideoJobStatus.RUNNING]),
+            )
+            .order_by(VideoJob.created_at)
+            .with_for_update()
+            .first()
+        )
+        if existing:
+            if existing.ai_request_id != ai_request_id and str(ai_request_id) not in (existing.aliases or []):
+                existing.aliases = [*(existing.aliases or []), str(ai_request_id)]
+                logger.info(f"ai_request_id {ai_request_id} joined in-flight video job {existing.id}")
+            db.commit()
+            db.refresh(existing)
+            return VideoJobResponse.from_orm(existing)
+
+    job = VideoJob(
+        ai_request_id=ai_request_id,
+        language=language,
+        response=response,
+        course_request=request.model_dump(mode="json", exclude={"encoding_profile"}) if request is not None else None,
+        request_hash=request_hash,
+        spring_boot_host=spring_boot_host,
+        encoding_profile=encoding_profile,
+        status=VideoJobStatus.QUEUED,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.info(f"Queued video job {job.id} for ai_request_id {ai_request_id}")
+    return VideoJobResponse.from_orm(job)
+
+
+def submit_batch(db: Session, batch: BatchRequest, spring_boot_host: str = "localhost", model_api_host: str = "localhost") -> BatchResponse:
+    """Queue one job per distinct course; duplicates become aliases of it."""
+    batch_id = uuid.uuid4()
+    groups = {}
+    for item in batch.items:
+        profile = item.request.encoding_profile or batch.encoding_profile
+        key = (job_hash(item.request, profile, item.response), item.request.regenerate)
+        groups.setdefault(key, []).append(item)
+
+    # Jobs are only coalesced within the batch, so its status covers every
+    # request; renders finished elsewhere are still reused at run time.
+    for (request_hash, _), items in groups.items():
+        primary = items[0]
+        db.add(VideoJob(
+            ai_request_id=primary.ai_request_id,
+            batch_id=batch_id,
+            language=primary.request.language,
+            response=primary.response,
+            course_request=primary.request.model_dump(mode="json", exclude={"encoding_profile"}),
+            request_hash=request_hash,
+            model_api_host=model_api_host,
+            spring_boot_host=spring_boot_host,
+            encoding_profile=primary.request.encoding_profile or batch.encoding_profile,
+            aliases=[str(item.ai_request_id) for item in items if item is not primary],
+            status=VideoJobStatus.QUEUED,
+        ))
+    db.commit()
+    logger.info(f"Queued batch {batch_id}: {len(batch.items)} requests, {len(groups)} distinct courses")
+    return get_batch(db, batch_id)
+
+
+def get_batch(db: Session, batch_id: UUID) -> BatchResponse:
+    jobs = db.query(VideoJob).filter(VideoJob.batch_id == batch_id).order_by(VideoJob.created_at).all()
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    counts = {status.value: 0 for status in VideoJobStatus}
+    assignments = {}
+    weighted, requests = 0.0, 0
+    for job in jobs:
+        counts[job.status.value] += 1
+        served = [job.ai_request_id, *(UUID(alias) for alias in job.aliases or [])]
+        assignments.update({ai_request_id: job.id for ai_request_id in served})
+        # Each job counts once per request it serves.
+        weighted += job.progress * len(served)
+        requests += len(served)
+
+    if counts[VideoJobStatus.QUEUED.value] == len(jobs):
+        status = VideoJobStatus.QUEUED
+    elif counts[VideoJobStatus.QUEUED.value] or counts[VideoJobStatus.RUNNING.value]:
+        status = VideoJobStatus.RUNNING
+    elif counts[VideoJobStatus.FAILED.value]:
+        status = VideoJobStatus.FAILED
+    else:
+        status = VideoJobStatus.SUCCEEDED
+
+    return BatchResponse(
+        batch_id=batch_id,
+        status=status.value,
+        progress=round(weighted / requests, 4),
+        total=requests,
+        counts=counts,
+        assignments=assignments,
+        jobs=[VideoJobResponse.from_orm(job) for job in jobs],
+    )
+
+
+def get_job(db: Session, job_id: UUID) -> VideoJobResponse:
+    job = db.query(VideoJob).filter(VideoJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Video job not found")
+    return VideoJobResponse.from_orm(job)
+
+
+def claim_next_job(db: Session, worker_id: str) -> UUID | None:
+    """Atomically move the oldest queued job to RUNNING for this worker.
+
+    Respects VIDEO_MAX_RUNNING_JOBS and VIDEO_BATCH_MAX_RUNNING_JOBS, so a
+    large batch cannot take every worker at once.
+    """
+    if VIDEO_MAX_RUNNING_JOBS or VIDEO_BATCH_MAX_RUNNING_JOBS:
+        # Counting and claiming must not interleave across workers.
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CLAIM_LOCK_KEY})
+    if VIDEO_MAX_RUNNING_JOBS:
+        running = db.query(func.count(VideoJob.id)).filter(VideoJob.status == VideoJobStatus.RUNNING).scalar()
+        if running >= VIDEO_MAX_RUNNING_JOBS:
+            db.commit()
+            return None
+
+    query = db.query(VideoJob).filter(VideoJob.status == VideoJobStatus.QUEUED)
+    if VIDEO_BATCH_MAX_RUNNING_JOBS:
+        saturated = (
+            select(VideoJob.batch_id)
+            .where(VideoJob.status == VideoJobStatus.RUNNING, VideoJob.batch_id.is_not(None))
+            .group_by(VideoJob.batch_id)
+            .having(func.count(VideoJob.id) >= VIDEO_BATCH_MAX_RUNNING_JOBS)
+        )
+        query = query.filter(or_(VideoJob.batch_id.is_(None), VideoJob.batch_id.not_in(saturated)))
+    job = (
+        query
+        .order_by(VideoJob.created_at)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.commit()
+        return None
+    now = datetime.utcnow()
+    job.status = VideoJobStatus.RUNNING
+    job.worker_id = worker_id
+    job.attempts += 1
+    job.error = None
+    job.started_at = now
+    job.heartbeat_at = now
+    db.commit()
+    return job.id
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Requeue RUNNING jobs whose worker stopped heartbeating (crash or restart)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=VIDEO_JOB_STALE_SECONDS)
+    stale = (
+        db.query(VideoJob)
+        .filter(VideoJob.status == VideoJobStatus.RUNNING, VideoJob.heartbeat_at < cutoff)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in stale:
+        if job.attempts >= VIDEO_JOB_MAX_ATTEMPTS:
+            job.status = VideoJobStatus.FAILED
+            job.error = job.error or "Worker stopped responding"
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = VideoJobStatus.QUEUED
+            job.worker_id = None
+        logger.warning(f"Video job {job.id} was abandoned by its worker, now {job.status.value}")
+    db.commit()
+    return len(stale)
+
+
+def _update_job(job_id: UUID, **fields):
+    db = SessionLocal()
+    try:
+        db.query(VideoJob).filter(VideoJob.id == job_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+def heartbeat(job_id: UUID):
+    _update_job(job_id, heartbeat_at=datetime.utcnow())
+
+
+def _job_aliases(job_id: UUID) -> list[UUID]:
+    db = SessionLocal()
+    try:
+        job = db.query(VideoJob).filter(VideoJob.id == job_id).first()
+        return [UUID(alias) for alias in job.aliases or []]
+    finally:
+        db.close()
+
+
+def _finish_job(job_id: UUID, published: set, result: dict) -> bool:
+    """Mark the job SUCCEEDED unless aliases joined it since the last check.
+
+    Holding the row lock while comparing means a submit_job that joins
+    the job either lands before this (and gets published) or sees it
+    finished (and queues its own job).
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(VideoJob).filter(VideoJob.id == job_id).with_for_update().first()
+        if {UUID(alias) for alias in job.aliases or []} - published:
+            db.commit()
+            return False
+        job.status = VideoJobStatus.SUCCEEDED
+        job.stage = "done"
+        job.progress = 1.0
+        job.result = result
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+async def run_job(job_id: UUID):
+    db = SessionLocal()
+    try:
+        job = db.query(VideoJob).filter(VideoJob.id == job_id).first()
+        ai_request_id, language = job.ai_request_id, job.language
+        response, spring_boot_host = job.response, job.spring_boot_host
+        course_request, model_api_host = job.course_request, job.model_api_host
+        encoding_profile = job.encoding_profile
+        attempts = job.attempts
+    finally:
+        db.close()
+
+    def progress(stage: str, fraction: float):
+        _update_job(job_id, stage=stage, progress=overall_progress(stage, fraction), heartbeat_at=datetime.utcnow())
+
+    try:
+        if response is None:
+            progress("model", 0.0)
+            response = await request_course_content(CourseRequest(**course_request), ai_request_id, model_api_host or "localhost")
+            # Kept on the job, so a retry does not ask the model again.
+            _update_job(job_id, response=response)
+        progress("model", 1.0)
+        if course_request is not None:
+            request = CourseRequest(**course_request, encoding_profile=encoding_profile)
+            result = await produce_course_video(ai_request_id, request, response, spring_boot_host, progress, encoding_profile)
+        else:
+            result = await check_and_generate_video(ai_request_id, language, response, spring_boot_host, progress, encoding_profile)
+
+        published = set()
+        while True:
+            for alias in _job_aliases(job_id):
+                if alias in published:
+                    continue
+                alias_result = await publish_alias(ai_request_id, alias, language, response, spring_boot_host)
+                result.setdefault("aliases", {})[str(alias)] = alias_result["video"]
+                published.add(alias)
+            if _finish_job(job_id, published, result):
+                break
+    except Exception as e:
+        logger.error(f"Video job {job_id} failed (attempt {attempts}): {e}")
+        retry = attempts < VIDEO_JOB_MAX_ATTEMPTS
+        _update_job(
+            job_id,
+            status=VideoJobStatus.QUEUED if retry else VideoJobStatus.FAILED,
+            error=str(e),
+            worker_id=None,
+            finished_at=None if retry else datetime.utcnow(),
+        )
+        return
+    logger.info(f"Video job {job_id} succeeded")
@@ -0,0 +1,108 @@
+"""Video generation worker.
+
+Run from the backend directory (where ``presentations/`` lives):
+
+    python -m app.workers.video_worker --workers 2
+
+Each worker process claims queued jobs from the ``video_jobs`` table and
+runs the slide -> audio -> video -> upload pipeline outside the API server.
+Jobs left RUNNING by a crashed or restarted worker are requeued once their
+heartbeat goes stale.
+"""
+import os
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import threading
+import multiprocessing
+
+from dotenv import load_dotenv
+
+from app.configs.db import SessionLocal, engine, init_db
+from app.services.browser_pool import browser_pool
+from app.services.http_client import close_client
+from app.services.video_job_service import claim_next_job, requeue_stale_jobs, heartbeat, run_job
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", "2"))
+VIDEO_WORKER_POLL_SECONDS = float(os.getenv("VIDEO_WORKER_POLL_SECONDS", "2"))
+VIDEO_WORKER_HEARTBEAT_SECONDS = float(os.getenv("VIDEO_WORKER_HEARTBEAT_SECONDS", "30"))
+
+
+def _keep_alive(job_id, stop: threading.Event):
+    while not stop.wait(VIDEO_WORKER_HEARTBEAT_SECONDS):
+        try:
+            heartbeat(job_id)
+        except Exception as e:
+            logger.warning(f"Heartbeat failed for video job {job_id}: {e}")
+
+
+async def _run(job_id):
+    try:
+        await run_job(job_id)
+    finally:
+        # Each job runs on its own event loop; release that loop's connections.
+        await close_client()
+
+
+def work(worker_id: str):
+    logger.info(f"Video worker {worker_id} started")
+    try:
+        while True:
+            db = SessionLocal()
+            try:
+                requeue_stale_jobs(db)
+                job_id = claim_next_job(db, worker_id)
+            except Exception as e:
+                logger.error(f"Video worker {worker_id} could not poll the queue: {e}")
+                job_id = None
+            finally:
+                db.close()
+
+            if job_id is None:
+                time.sleep(VIDEO_WORKER_POLL_SECONDS)
+                continue
+
+            logger.info(f"Video worker {worker_id} running job {job_id}")
+            stop = threading.Event()
+            keep_alive = threading.Thread(target=_keep_alive, args=(job_id, stop), daemon=True)
+            keep_alive.start()
+            try:
+                asyncio.run(_run(job_id))
+            finally:
+                stop.set()
+                keep_alive.join()
+    finally:
+        browser_pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run video generation workers")
+    parser.add_argument("--workers", type=int, default=VIDEO_WORKERS, help="number of worker processes")
+    args = parser.parse_args()
+
+    init_db()
+    # Forked workers must not share the parent's pooled connections; each
+    # child opens its own on first use.
+    engine.dispose()
+    host = socket.gethostname()
+    processes = []
+    for n in range(max(1, args.workers)):
+        process = multiprocessing.Process(target=work, args=(f"{host}:{os.getpid()}:{n}",), daemon=False)
+        process.start()
+        processes.append(process)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compare the "clips" and "single_pass" assembly modes of generate_video.
+
+Run from the backend directory:
+
+    python -m scripts.bench_assembly --slides 12 --seconds 6
+
+Each mode renders the same sample presentation from scratch in a temporary
+directory. Reported per mode: wall time, CPU time of the ffmpeg (and
+browser) subprocesses, bytes of intermediate clips written, and the size of
+the final video.
+"""
+import os
+import time
+import argparse
+import resource
+import tempfile
+import contextlib
+
+from app.services import content_service
+from scripts.bench_sample import build_sample, reset_render
+
+AI_REQUEST_ID = "bench-assembly"
+
+
+def children_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def directory_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    )
+
+
+def measure(mode: str, slides: int, profile: str) -> dict:
+    reset_render(AI_REQUEST_ID)
+    content_service.VIDEO_ASSEMBLY_MODE = mode
+    cpu = children_cpu()
+    started = time.perf_counter()
+    # The pipeline reports progress with print(); keep the table readable.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        video = content_service.generate_video(slides, AI_REQUEST_ID, None, profile)
+    return {
+        "wall": time.perf_counter() - started,
+        "cpu": children_cpu() - cpu,
+        "clips": directory_bytes(f"presentations/{AI_REQUEST_ID}/clips"),
+        "video": os.path.getsize(video),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark course video assembly modes")
+    parser.add_argument("--slides", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=6.0, help="average narration length per slide")
+    parser.add_argument("--profile", default="standard")
+    parser.add_argument("--rasterizer", default="pillow", choices=["pillow", "browser"])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the fastest is reported")
+    args = parser.parse_args()
+
+    content_service.SLIDE_RASTERIZER = args.rasterizer
+    content_service.VIDEO_HLS_ENABLED = False
+    os.chdir(tempfile.mkdtemp(prefix="bench-assembly-"))
+    build_sample(AI_REQUEST_ID, args.slides, args.seconds)
+
+    print(f"{args.slides} slides of ~{args.seconds:g}s, profile {args.profile}, rasterizer {args.rasterizer}, "
+          f"{content_service.VIDEO_RENDER_WORKERS} render workers")
+    print(f"{'mode':<13}{'wall s':>9}{'ffmpeg cpu s':>14}{'clips MB':>10}{'video MB':>10}")
+    for mode in ("clips", "single_pass"):
+        result = min((measure(mode, args.slides, args.profile) for _ in range(args.repeat)), key=lambda r: r["wall"])
+        print(f"{mode:<13}{result['wall']:>9.2f}{result['cpu']:>14.2f}"
+              f"{result['clips'] / 1e6:>10.2f}{result['video'] / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Event-loop latency of the API while a course video renders.
+
+Run from the backend directory:
+
+    python -m scripts.bench_event_loop --slides 8 --seconds 4
+
+GET / is sent to the application over ASGI every 5 ms while
+generate_video renders a sample presentation, either called directly on
+the event loop ("inline", as before media_executor) or through
+run_blocking ("executor"). Rendering happens in a temporary directory.
+
+The script exits with status 1 when the executor p99 is above
+--max-p99-ms, so it can gate CI.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import contextlib
+import tempfile
+import statistics
+
+import httpx
+
+from app.main import app
+from app.services import content_service
+from scripts.bench_sample import build_sample, reset_render
+
+AI_REQUEST_ID = "bench-event-loop"
+PROBE_INTERVAL = 0.005
+
+
+async def measure(mode: str, slides: int, profile: str) -> list:
+    reset_render(AI_REQUEST_ID)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/")
+
+        async def render():
+            if mode == "inline":
+                content_service.generate_video(slides, AI_REQUEST_ID, None, profile)
+            else:
+                await content_service.run_blocking(content_service.generate_video, slides, AI_REQUEST_ID, None, profile)
+
+        async def probe():
+            # Latency is counted from when each request was due, so time the
+            # loop spends blocked before it can even send one is included.
+            due = time.perf_counter()
+            while True:
+                response = await client.get("/")
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - due) * 1000)
+                due = time.perf_counter() + PROBE_INTERVAL
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await render()
+        elapsed = time.perf_counter() - started
+        # Let the probe complete the request that was due during the render.
+        count = len(latencies)
+        while len(latencies) == count:
+            await asyncio.sleep(PROBE_INTERVAL)
+        prober.cancel()
+    return latencies, elapsed
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GET / latency during a render")
+    parser.add_argument("--slides", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=4.0, help="average narration length per slide")
+    parser.add_argument("--profile", default="fast-preview")
+    parser.add_argument("--rasterizer", default="pillow", choices=["pillow", "browser"])
+    parser.add_argument("--max-p99-ms", type=float, default=50.0,
+                        help="fail when the executor p99 latency is above this")
+    args = parser.parse_args()
+
+    content_service.SLIDE_RASTERIZER = args.rasterizer
+    content_service.VIDEO_HLS_ENABLED = False
+    os.chdir(tempfile.mkdtemp(prefix="bench-event-loop-"))
+    build_sample(AI_REQUEST_ID, args.slides, args.seconds)
+
+    print(f"{args.slides} slides, profile {args.profile}, rasterizer {args.rasterizer}")
+    print(f"{'mode':<10}{'render s':>10}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    p99 = {}
+    for mode in ("inline", "executor"):
+        # The pipeline reports progress with print(); keep the table readable.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            latencies, elapsed = asyncio.run(measure(mode, args.slides, args.profile))
+        p99[mode] = percentile(latencies, 0.99)
+        print(f"{mode:<10}{elapsed:>10.2f}{len(latencies):>10}{statistics.median(latencies):>10.2f}"
+              f"{p99[mode]:>10.2f}{max(latencies):>10.2f}")
+
+    if p99["executor"] > args.max_p99_ms:
+        print(f"executor p99 {p99['executor']:.2f} ms is above --max-p99-ms {args.max_p99_ms:.2f}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
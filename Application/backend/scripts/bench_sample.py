@@ -0,0 +1,55 @@
+"""Sample presentation shared by the benchmark scripts in this directory."""
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+from app.services.slide_templates import render_slide, write_stylesheet
+
+SAMPLE_CODE = """<pre><code class="language-java">public class Greeter {
+    public static void main(String[] args) {
+        for (int i = 0; i < 3; i++) {
+            System.out.println("Hello " + i);
+        }
+    }
+}</code></pre>"""
+
+
+def build_sample(ai_request_id: str, slides: int, seconds: float) -> int:
+    """Write presentations/<ai_request_id>/ with slides and tone audio.
+
+    Paths are relative, like generate_video's, so call this from the
+    directory the benchmark renders in.
+    """
+    presentation_dir = Path(f"presentations/{ai_request_id}")
+    shutil.rmtree(presentation_dir, ignore_errors=True)
+    (presentation_dir / "slides").mkdir(parents=True)
+    (presentation_dir / "audios").mkdir()
+    write_stylesheet(presentation_dir)
+    for i in range(1, slides + 1):
+        slide = {
+            "id": i,
+            "title": f"Loops, part {i}",
+            "summary": f"<p><strong>Slide {i}</strong>: a for loop repeats its body while the condition holds.</p>",
+            "example_code": SAMPLE_CODE,
+        }
+        (presentation_dir / "slides" / f"slide{i}.html").write_text(render_slide(slide), encoding="utf-8")
+        # Vary the durations a little, as narration does.
+        duration = seconds * (0.75 + 0.5 * (i % 3) / 2)
+        subprocess.run(
+            ['ffmpeg', '-y', '-f', 'lavfi', '-i', f'sine=frequency={220 * i}:duration={duration:.2f}',
+             '-c:a', 'libmp3lame', '-b:a', '64k', str(presentation_dir / "audios" / f"audio{i}.mp3")],
+            check=True, capture_output=True
+        )
+    return slides
+
+
+def reset_render(ai_request_id: str):
+    """Drop the video, clips and manifest so the next render starts cold."""
+    presentation_dir = f"presentations/{ai_request_id}"
+    for name in ("clips", "hls"):
+        shutil.rmtree(os.path.join(presentation_dir, name), ignore_errors=True)
+    for name in (f"{ai_request_id}.mp4", "manifest.json"):
+        path = os.path.join(presentation_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
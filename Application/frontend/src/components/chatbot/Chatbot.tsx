@@ -17,6 +17,7 @@ interface Message {
   text: string;
   sender: "user" | "bot";
   timestamp: string;
+  streaming?: boolean;
 }
 
 interface AudioCaptureProps {
@@ -125,6 +126,26 @@ export const Chatbot = ({
           } else {
             toast({ title: "Error", description: "Failed to transcribe audio", variant: "destructive" });
           }
+        } else if (data.type === "text_delta") {
+          setMessages((prev) => {
+            const last = prev[prev.length - 1];
+            if (last && last.sender === "bot" && last.streaming) {
+              return [...prev.slice(0, -1), { ...last, text: last.text + (data.text || "") }];
+            }
+            return [
+              ...prev,
+              { text: data.text || "", sender: "bot", timestamp: new Date().toLocaleTimeString(), streaming: true },
+            ];
+          });
+        } else if (data.type === "text_done") {
+          setMessages((prev) => {
+            const last = prev[prev.length - 1];
+            if (last && last.sender === "bot" && last.streaming) {
+              return [...prev.slice(0, -1), { ...last, text: data.text ?? last.text, streaming: false }];
+            }
+            return prev;
+          });
+          if (onResponse) onResponse(data.text || "");
         } else if (data.type === "text_response") {
           setMessages((prev) => [
             ...prev,
@@ -259,6 +280,7 @@ export const Chatbot = ({
         type: "text_question",
         question: textInput,
         course_id: courseId,
+        stream: true,
       }).catch((error) => console.error("Send text error:", error));
       toast({ title: "Text Sent", description: "Processing your text question..." });
       setTextInput("");
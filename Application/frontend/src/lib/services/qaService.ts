@@ -7,10 +7,11 @@ interface QAMessage {
   audio_data?: string;
   course_id?: string;
   token?: string;
+  stream?: boolean;
 }
 
 interface QAResponse {
-  type: "transcription_ready" | "text_response" | "error" | "auth_success" | "audio_ready" | "animation_ready";
+  type: "transcription_ready" | "text_response" | "text_delta" | "text_done" | "error" | "auth_success" | "audio_ready" | "animation_ready";
   transcribed_text?: string;
   text?: string;
   message?: string;